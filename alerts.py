@@ -0,0 +1,57 @@
+import time
+from collections import Counter
+
+
+class AlertAggregator:
+    """Дедупликация и ограничение частоты уведомлений об ошибках.
+
+    Ошибки группируются по ключу (класс исключения, аккаунт). Первая ошибка
+    с ключом отправляется сразу, повторы внутри окна `window` только
+    подсчитываются. Не чаще раза в `digest_period` секунд накопленные
+    счетчики выдаются сводками, по одной на аккаунт.
+    """
+
+    def __init__(self, window=3600, digest_period=3600, clock=time.monotonic):
+        self.window = window
+        self.digest_period = digest_period
+        self.clock = clock
+        self._last_sent = {}
+        self._suppressed = Counter()
+        self._last_digest = clock()
+
+    def register(self, error, account=None):
+        """Учет ошибки. Возвращает True, если о ней нужно сообщить."""
+        key = (type(error).__name__, account)
+        now = self.clock()
+        sent_at = self._last_sent.get(key)
+        if sent_at is not None and now - sent_at < self.window:
+            self._suppressed[key] += 1
+            return False
+        self._last_sent[key] = now
+        return True
+
+    def digest(self):
+        """Сводки подавленных ошибок по аккаунтам: список (аккаунт, текст).
+
+        Пустой список, если срок сводки не подошел или отправлять нечего.
+        """
+        now = self.clock()
+        if now - self._last_digest < self.digest_period:
+            return []
+        self._last_digest = now
+        self._last_sent = {
+            key: sent_at for key, sent_at in self._last_sent.items()
+            if now - sent_at < self.window
+        }
+        lines = {}
+        for (name, account), count in sorted(
+            self._suppressed.items(), key=lambda item: str(item[0])
+        ):
+            lines.setdefault(account, []).append(
+                f'{name} ({account}): {count}'
+            )
+        self._suppressed.clear()
+        return [
+            (account, 'Повторяющиеся ошибки за период:\n' + '\n'.join(part))
+            for account, part in lines.items()
+        ]
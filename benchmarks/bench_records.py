@@ -0,0 +1,82 @@
+"""Память и скорость разбора ответа API: словари против HomeworkRecord.
+
+Ответ с N работами в формате API Практикума разбирается из JSON.
+Сравнивается память, удерживаемая списком исходных словарей и списком
+записей из check_response, и скорость check_response + parse_status.
+
+Запуск: python benchmarks/bench_records.py [N]
+"""
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+
+STATUSES = tuple(homework.HOMEWORK_STATUSES)
+
+
+def make_payload(count):
+    return json.dumps({'current_date': 0, 'homeworks': [{
+        'id': number,
+        'status': STATUSES[number % len(STATUSES)],
+        'homework_name': f'student_{number}__hw05_final.zip',
+        'reviewer_comment': 'Код аккуратный, есть пара замечаний.',
+        'date_updated': '2022-02-13T14:40:57Z',
+        'lesson_name': 'Финальный проект спринта',
+    } for number in range(count)]})
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    logging.disable(logging.CRITICAL)
+    payload = make_payload(count)
+
+    raw, raw_size = retained(lambda: json.loads(payload)['homeworks'])
+    del raw
+    records, records_size = retained(
+        lambda: homework.check_response(json.loads(payload))
+    )
+    del records
+
+    response = json.loads(payload)
+    records, checked = timed(homework.check_response, response)
+    homeworks = response['homeworks']
+    _, from_dicts = timed(lambda: [homework.parse_status(h) for h in homeworks])
+    homework.LAST_STATUS.clear()
+    _, from_records = timed(
+        lambda: [homework.parse_status(r) for r in records]
+    )
+
+    mb = 2 ** 20
+    print(f'работ: {count}')
+    print(f'    словари из JSON: {raw_size / mb:.0f} МБ')
+    print(f'    HomeworkRecord: {records_size / mb:.0f} МБ')
+    print(f'    check_response: {checked:.2f} с '
+          f'({count / checked:,.0f} работ/с)')
+    print(f'    parse_status по словарям: {from_dicts:.2f} с')
+    print(f'    parse_status по записям: {from_records:.2f} с')
+
+
+if __name__ == '__main__':
+    main()
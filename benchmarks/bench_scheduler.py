@@ -0,0 +1,86 @@
+"""Симуляция планировщика опросов на 100 тысячах аккаунтов.
+
+Воркер успевает меньше опросов в секунду, чем нужно для интервала
+RETRY_TIME, и планировщик вынужден выбирать, кого опрашивать первым.
+
+Запуск: python benchmarks/bench_scheduler.py [аккаунтов] [опросов/с]
+"""
+import random
+import sys
+import time
+from collections import defaultdict
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+from scheduler import ACTIVE, IDLE, REVIEWING, PollScheduler  # noqa: E402
+
+INTERVAL = 600
+DURATION = 4 * 3600
+NAMES = {REVIEWING: 'reviewing', ACTIVE: 'active', IDLE: 'idle'}
+
+
+class SimClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(accounts, capacity, seed=0):
+    rnd = random.Random(seed)
+    clock = SimClock()
+    scheduler = PollScheduler(
+        interval=INTERVAL, active_period=3600, clock=clock
+    )
+    kinds = {}
+    for name in range(accounts):
+        roll = rnd.random()
+        kind = REVIEWING if roll < 0.1 else ACTIVE if roll < 0.3 else IDLE
+        kinds[name] = kind
+        scheduler.add(
+            name, tier=int(rnd.random() < 0.05),
+            due=rnd.uniform(0, INTERVAL),
+            last_active=-3600.0 if kind == IDLE else 0.0
+        )
+    last_poll = {}
+    gaps = defaultdict(list)
+    started = time.perf_counter()
+    while clock.now < DURATION:
+        for name in scheduler.pop_due(limit=capacity):
+            kind = kinds[name]
+            if name in last_poll:
+                gaps[kind].append(clock.now - last_poll[name])
+            last_poll[name] = clock.now
+            scheduler.done(
+                name, reviewing=kind == REVIEWING, active=kind != IDLE
+            )
+        clock.now += 1
+    elapsed = time.perf_counter() - started
+    return gaps, elapsed, scheduler.lag()
+
+
+def main():
+    accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    gaps, elapsed, lag = simulate(accounts, capacity)
+    polls = sum(len(values) for values in gaps.values())
+    print(f'аккаунтов: {accounts}, емкость: {capacity} опросов/с, '
+          f'нужно: {accounts / INTERVAL:.0f} опросов/с')
+    for kind in (REVIEWING, ACTIVE, IDLE):
+        values = sorted(gaps[kind])
+        if not values:
+            continue
+        mean = sum(values) / len(values)
+        p99 = values[int(len(values) * 0.99)]
+        print(f'{NAMES[kind]:>10}: средний интервал {mean:7.1f} с, '
+              f'p99 {p99:7.1f} с')
+    print(f'итоговое отставание: {lag:.1f} с')
+    print(f'{polls} опросов за {elapsed:.2f} с '
+          f'({polls / elapsed:,.0f} операций/с)')
+
+
+if __name__ == '__main__':
+    main()
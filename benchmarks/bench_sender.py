@@ -0,0 +1,78 @@
+"""Отправка в Telegram: прямой вызов против пула SendExecutor.
+
+Фейковый сервер Telegram из tests/harness.py отвечает с задержкой
+TELEGRAM_DELAY и разбросом TELEGRAM_JITTER.
+Цикл опрашивает аккаунты через фейковый API Практикума (задержка
+PRACTICUM_DELAY) и на каждый отправляет MESSAGES сообщений.
+
+Запуск: python benchmarks/bench_sender.py [аккаунтов] [потоков]
+"""
+import sys
+import time
+from concurrent.futures import wait
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import requests  # noqa: E402
+import telegram  # noqa: E402
+
+from sender import SendExecutor  # noqa: E402
+from tests.harness import (  # noqa: E402
+    FakePracticumServer,
+    FakeTelegramServer,
+)
+
+TOKEN = '1234:bench'
+TELEGRAM_DELAY = 0.1
+TELEGRAM_JITTER = 0.02
+PRACTICUM_DELAY = 0.05
+MESSAGES = 2
+
+
+def cycle(bot, practicum, accounts):
+    started = time.perf_counter()
+    futures = []
+    for account in range(accounts):
+        requests.get(
+            practicum.url, headers={'Authorization': 'OAuth bench'},
+            params={'from_date': 0}, timeout=5
+        ).json()
+        for number in range(MESSAGES):
+            result = bot.send_message(account + 1, f'{account}-{number}')
+            if not isinstance(result, telegram.Message):
+                futures.append(result)
+    wait(futures)
+    for future in futures:
+        future.result()
+    return time.perf_counter() - started
+
+
+def main():
+    accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with FakePracticumServer(latency=PRACTICUM_DELAY) as practicum, \
+            FakeTelegramServer(
+                latency=TELEGRAM_DELAY, jitter=TELEGRAM_JITTER
+            ) as server:
+        inline = cycle(
+            telegram.Bot(TOKEN, base_url=server.base_url), practicum,
+            accounts
+        )
+        executor = SendExecutor(
+            TOKEN, workers=workers, base_url=server.base_url
+        )
+        pooled = cycle(executor, practicum, accounts)
+        executor.shutdown()
+
+    floor = accounts * PRACTICUM_DELAY
+    print(f'{accounts} аккаунтов x {MESSAGES} сообщений, '
+          f'Telegram {TELEGRAM_DELAY * 1000:.0f} мс, '
+          f'Practicum {PRACTICUM_DELAY * 1000:.0f} мс')
+    print(f'    прямой вызов: {inline:.2f} с')
+    print(f'    SendExecutor({workers}): {pooled:.2f} с')
+    print(f'    только опрос Practicum: {floor:.2f} с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Запуск и перезагрузка реестра на 50 тысячах аккаунтов.
+
+Меряется первичная загрузка из SQLite и YAML вместе с постановкой
+аккаунтов в планировщик, проверка неизменного источника и перезагрузка
+после изменения 100 записей.
+
+Запуск: python benchmarks/bench_tenants.py [аккаунтов]
+"""
+import sqlite3
+import sys
+import tempfile
+import time
+from os.path import abspath, dirname, join
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+from scheduler import PollScheduler  # noqa: E402
+from tenants import (  # noqa: E402
+    SqliteSource,
+    TenantRegistry,
+    YamlSource,
+    yaml,
+)
+
+RETRY_TIME = 600
+
+
+def start(source):
+    started = time.perf_counter()
+    registry = TenantRegistry(source)
+    scheduler = PollScheduler(interval=RETRY_TIME)
+    diff = registry.reload(force=True)
+    now = time.time()
+    for index, tenant in enumerate(diff.added):
+        scheduler.add(tenant.account,
+                      due=now + RETRY_TIME * index / len(diff.added))
+    return registry, time.perf_counter() - started
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def bench_sqlite(directory, rows):
+    path = join(directory, 'tenants.db')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE tenants '
+        '(account TEXT PRIMARY KEY, practicum_token TEXT, chat_id TEXT)'
+    )
+    connection.executemany('INSERT INTO tenants VALUES (?, ?, ?)', rows)
+    connection.commit()
+    registry, startup = start(SqliteSource(path))
+    _, idle = timed(registry.reload)
+    connection.executemany(
+        'UPDATE tenants SET practicum_token = ? WHERE account = ?',
+        [(f'new-{n}', f'user{n}') for n in range(100)]
+    )
+    connection.commit()
+    diff, reload = timed(registry.reload)
+    connection.close()
+    return startup, idle, reload, len(diff.changed)
+
+
+def bench_yaml(directory, rows):
+    path = join(directory, 'tenants.yaml')
+
+    def write(rows):
+        with open(path, 'w', encoding='utf-8') as file:
+            yaml.dump([
+                {'account': a, 'practicum_token': t, 'chat_id': c}
+                for a, t, c in rows
+            ], file, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper))
+
+    write(rows)
+    registry, startup = start(YamlSource(path))
+    _, idle = timed(registry.reload)
+    rows = [(a, f'new-{n}' if n < 100 else t, c)
+            for n, (a, t, c) in enumerate(rows)]
+    write(rows)
+    diff, reload = timed(registry.reload)
+    return startup, idle, reload, len(diff.changed)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rows = [(f'user{n}', f'token-{n}', str(n // 20)) for n in range(count)]
+    print(f'аккаунтов: {count}')
+    with tempfile.TemporaryDirectory() as directory:
+        benches = [('SQLite', bench_sqlite)]
+        if yaml is not None:
+            benches.append(('YAML', bench_yaml))
+        for name, bench in benches:
+            startup, idle, reload, changed = bench(directory, rows)
+            print(f'{name:>7}: запуск {startup:.2f} с, '
+                  f'проверка без изменений {idle * 1000:.2f} мс, '
+                  f'перезагрузка {reload:.2f} с (изменено {changed})')
+
+
+if __name__ == '__main__':
+    main()
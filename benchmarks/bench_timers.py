@@ -0,0 +1,140 @@
+"""Сравнение таймеров опросов: колесо, куча и asyncio-задача на аккаунт.
+
+Для колеса и кучи время симулируется: N сроков равномерно в пределах
+RETRY_TIME, 10% отменяются, затем таймеры проворачиваются по секундам.
+Задачи asyncio спят по-настоящему, поэтому их сроки сжаты до SPAN секунд,
+а в отчет идут накладные расходы сверх SPAN.
+
+Запуск: python benchmarks/bench_timers.py [N] [N для asyncio]
+"""
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+from scheduler import HeapTimers, TimingWheel  # noqa: E402
+
+RETRY_TIME = 600
+SPAN = 2.0
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    keep = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return size
+
+
+def bench_timers(factory, deadlines, cancelled):
+    timers = factory()
+    started = time.perf_counter()
+    for key, deadline in enumerate(deadlines):
+        timers.add(key, deadline)
+    inserted = time.perf_counter()
+    for key in cancelled:
+        timers.cancel(key)
+    cancelled_at = time.perf_counter()
+    fired = 0
+    for now in range(RETRY_TIME + 1):
+        fired += len(timers.advance(now))
+    finished = time.perf_counter()
+
+    def build():
+        timers = factory()
+        for key, deadline in enumerate(deadlines):
+            timers.add(key, deadline)
+        return timers
+
+    return {
+        'вставка': inserted - started,
+        'отмена': cancelled_at - inserted,
+        'срабатывание': finished - cancelled_at,
+        'сработало': fired,
+        'память, МБ': measure_memory(build) / 2 ** 20,
+    }
+
+
+async def asyncio_tasks(deadlines, cancelled):
+    fired = 0
+
+    async def account(delay):
+        nonlocal fired
+        await asyncio.sleep(delay)
+        fired += 1
+
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(account(delay)) for delay in deadlines]
+    inserted = time.perf_counter()
+    for key in cancelled:
+        tasks[key].cancel()
+    cancelled_at = time.perf_counter()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    finished = time.perf_counter()
+    return {
+        'вставка': inserted - started,
+        'отмена': cancelled_at - inserted,
+        'срабатывание': finished - cancelled_at - SPAN,
+        'сработало': fired,
+    }
+
+
+def bench_asyncio(count, rnd):
+    deadlines = [rnd.uniform(0, SPAN) for _ in range(count)]
+    cancelled = rnd.sample(range(count), count // 10)
+    result = asyncio.run(asyncio_tasks(deadlines, cancelled))
+
+    def build():
+        loop = asyncio.new_event_loop()
+
+        async def idle():
+            await asyncio.sleep(3600)
+
+        tasks = [loop.create_task(idle()) for _ in range(count)]
+        loop.run_until_complete(asyncio.sleep(0))
+        return loop, tasks
+
+    tracemalloc.start()
+    loop, tasks = build()
+    result['память, МБ'] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    loop.close()
+    return result
+
+
+def report(name, count, result):
+    print(f'{name} (N={count}):')
+    for key, value in result.items():
+        if isinstance(value, float):
+            print(f'    {key}: {value:.3f}')
+        else:
+            print(f'    {key}: {value}')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    async_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rnd = random.Random(0)
+    deadlines = [rnd.uniform(0, RETRY_TIME) for _ in range(count)]
+    cancelled = rnd.sample(range(count), count // 10)
+    report('TimingWheel', count, bench_timers(
+        TimingWheel, deadlines, cancelled
+    ))
+    report('HeapTimers', count, bench_timers(
+        HeapTimers, deadlines, cancelled
+    ))
+    report('asyncio-задача на аккаунт', async_count, bench_asyncio(
+        async_count, rnd
+    ))
+
+
+if __name__ == '__main__':
+    main()
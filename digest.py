@@ -0,0 +1,97 @@
+import threading
+import time
+
+from telegram.constants import MAX_MESSAGE_LENGTH
+
+DIGEST_HEADER = 'Изменились статусы проверки работ ({count}):'
+
+
+class DigestBuffer:
+    """Сбор сообщений о статусах по чатам для отправки одной сводкой.
+
+    Сводка чата готова, когда с первого сообщения прошло `window` секунд
+    или накопилось `max_items` сообщений. Повторы в окне отбрасываются.
+    Сводка, возвращенная после сбоя отправки, ждет паузу повтора.
+    Методы можно вызывать из потоков отправки.
+    """
+
+    def __init__(self, window=60, max_items=20, clock=time.monotonic):
+        self.window = window
+        self.max_items = max_items
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._chats = {}
+        self._not_before = {}
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(items) for _, items in self._chats.values())
+
+    def add(self, chat_id, message):
+        """Добавление сообщения в сводку чата."""
+        with self._lock:
+            _, items = self._chats.setdefault(chat_id, (self.clock(), []))
+            if message not in items:
+                items.append(message)
+
+    def restore(self, chat_id, messages, delay=0):
+        """Возврат неотправленных сообщений в начало сводки чата.
+
+        Сводка чата выдается снова не раньше чем через `delay` секунд.
+        """
+        with self._lock:
+            now = self.clock()
+            opened, items = self._chats.get(chat_id, (now, []))
+            fresh = [message for message in items if message not in messages]
+            self._chats[chat_id] = (opened, list(messages) + fresh)
+            self._not_before[chat_id] = now + delay
+
+    def flush(self, force=False):
+        """Готовые сводки: список пар (чат, сообщения).
+
+        `force` выдает все сводки, в том числе ждущие повтора.
+        """
+        now = self.clock()
+        with self._lock:
+            ready = [
+                chat_id for chat_id, (opened, items) in self._chats.items()
+                if force or (
+                    now >= self._not_before.get(chat_id, now)
+                    and (
+                        len(items) >= self.max_items
+                        or now - opened >= self.window
+                    )
+                )
+            ]
+            for chat_id in ready:
+                self._not_before.pop(chat_id, None)
+            return [
+                (chat_id, self._chats.pop(chat_id)[1]) for chat_id in ready
+            ]
+
+
+def render_digest(messages, max_length=MAX_MESSAGE_LENGTH):
+    """Тексты сводки не длиннее `max_length`: список пар (текст, сообщения).
+
+    Одно сообщение уходит как есть, несколько - списком под заголовком.
+    Если список не помещается в одно сообщение Telegram, он делится на
+    части; слишком длинная строка обрезается.
+    """
+    if len(messages) == 1:
+        return [(messages[0][:max_length], messages)]
+    reserve = len(DIGEST_HEADER.format(count=len(messages))) + 1
+    parts = []
+    lines, part, length = [], [], reserve
+    for message in messages:
+        line = f'- {message}'[:max_length - reserve]
+        if lines and length + len(line) + 1 > max_length:
+            parts.append((lines, part))
+            lines, part, length = [], [], reserve
+        lines.append(line)
+        part.append(message)
+        length += len(line) + 1
+    parts.append((lines, part))
+    return [
+        ('\n'.join([DIGEST_HEADER.format(count=len(part))] + lines), part)
+        for lines, part in parts
+    ]
@@ -8,6 +8,12 @@ class NoKeys(KittyBotExceptions):
     pass
 
 
+class BadToken(NoKeys):
+    """API Практикума отклонил токен аккаунта."""
+
+    pass
+
+
 class FailSend(KittyBotExceptions):
     """Сбой отправки сообщения в телеграмм."""
 
@@ -30,3 +36,9 @@ class ProcessingProblem(KittyBotExceptions):
     """Отсутствие ожидаемых ключей в ответе API."""
 
     pass
+
+
+class BadTenants(KittyBotExceptions):
+    """Ошибка в источнике настроек аккаунтов."""
+
+    pass
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class HealthState:
+    """Состояние опроса для проверки работоспособности бота.
+
+    Главный цикл сообщает о каждом проходе через `tick`, а об опросах
+    аккаунтов - через `success` и `failure`. Если цикл завис, отставание
+    продолжает расти и после ожидаемого времени следующего прохода.
+    Отчет содержит итоги, подробности - только по аккаунтам с открытой
+    цепью, поэтому его размер не зависит от числа аккаунтов.
+    Дополнительные показатели отдают функции из `probes`.
+    """
+
+    def __init__(self, max_lag=300, failure_threshold=3, clock=time.time):
+        self.max_lag = max_lag
+        self.failure_threshold = failure_threshold
+        self.clock = clock
+        self.probes = {'send_backlog': lambda: 0}
+        self._lock = threading.Lock()
+        self._last_success = {}
+        self._failures = {}
+        self._lag = 0
+        self._next_tick = None
+
+    def tick(self, lag, wait=0):
+        """Проход главного цикла: текущее отставание и время до следующего."""
+        with self._lock:
+            self._lag = lag
+            self._next_tick = self.clock() + wait
+
+    def success(self, account):
+        """Успешный ответ API для аккаунта."""
+        with self._lock:
+            self._last_success[account] = self.clock()
+            self._failures.pop(account, None)
+
+    def failure(self, account):
+        """Неудачный опрос аккаунта."""
+        with self._lock:
+            self._failures[account] = self._failures.get(account, 0) + 1
+
+    def forget(self, account):
+        """Удаление сведений об аккаунте, снятом с опроса."""
+        with self._lock:
+            self._last_success.pop(account, None)
+            self._failures.pop(account, None)
+
+    def lag(self):
+        """Отставание опросов с учетом зависания главного цикла."""
+        with self._lock:
+            if self._next_tick is None:
+                return self._lag
+            return self._lag + max(0, self.clock() - self._next_tick)
+
+    def report(self):
+        """Отчет о состоянии и признак работоспособности."""
+        lag = self.lag()
+        with self._lock:
+            failing = {
+                str(account): {
+                    'failures': failures,
+                    'last_success': self._last_success.get(account),
+                }
+                for account, failures in self._failures.items()
+                if failures >= self.failure_threshold
+            }
+        report = {
+            'healthy': lag <= self.max_lag,
+            'lag': lag,
+            'open_circuits': len(failing),
+            'failing': failing,
+        }
+        for name, probe in self.probes.items():
+            report[name] = probe()
+        return report
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Обработчик /live, /health и /ready."""
+
+    state = None
+
+    def do_GET(self):
+        """Ответ с отчетом о состоянии в JSON."""
+        if self.path == '/live':
+            self._reply(HTTPStatus.OK, {'healthy': True})
+        elif self.path in ('/health', '/ready'):
+            report = self.state.report()
+            status = (
+                HTTPStatus.OK if report['healthy']
+                else HTTPStatus.SERVICE_UNAVAILABLE
+            )
+            self._reply(status, report)
+        else:
+            self._reply(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        """Запросы проверок не засоряют лог."""
+
+    def _reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve_health(state, port, host='127.0.0.1'):
+    """Запуск HTTP-сервера проверок в фоновом потоке.
+
+    По умолчанию сервер слушает только локальный интерфейс.
+    """
+    handler = type('BoundHealthHandler', (HealthHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -5,17 +5,31 @@ import time
 import telegram
 
 
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
+from functools import partial
 from http import HTTPStatus
+from typing import NamedTuple, Optional
 
+from alerts import AlertAggregator
+from digest import DigestBuffer, render_digest
 from exceptions import (
+    BadTenants,
     KittyBotExceptions,
     NoKeys,
+    BadToken,
     FailSend,
     DisableEndpoint,
     ProblemEndpoint,
     ProcessingProblem
 )
+from health import HealthState, serve_health
+from retry import AlertOnly, Backoff, GiveUp, Immediate, RetryPolicies
+from scheduler import PollScheduler
+from sender import SendExecutor
+from tenants import EnvSource, TenantRegistry, open_source
 
 
 logging.basicConfig(
@@ -35,10 +49,17 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+HEALTH_PORT = os.getenv('HEALTH_PORT')
+SEND_WORKERS = os.getenv('SEND_WORKERS')
+TENANTS_SOURCE = os.getenv('TENANTS_SOURCE')
+DIGEST_WINDOW = os.getenv('DIGEST_WINDOW')
 
 RETRY_TIME = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+TENANTS_RELOAD = 30
+POLL_BATCH = 10
+REQUEST_TIMEOUT = 30
 
 
 HOMEWORK_STATUSES = {
@@ -46,21 +67,108 @@ HOMEWORK_STATUSES = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+STATUS_CODES = {status: code for code, status in enumerate(HOMEWORK_STATUSES)}
+STATUS_NAMES = tuple(HOMEWORK_STATUSES)
+UNKNOWN_STATUS = -1
 
 LAST_STATUS = {}
-LAST_MESSAGE = ''
+LAST_MESSAGES = {}
+CURRENT_TENANT = ContextVar('CURRENT_TENANT', default=None)
+DIGEST_SIZE = 20
+DIGEST = (
+    DigestBuffer(window=int(DIGEST_WINDOW), max_items=DIGEST_SIZE)
+    if DIGEST_WINDOW else None
+)
+DIGEST_ATTEMPTS = {}
+
+ALERT_WINDOW = 3600
+ALERTS = AlertAggregator(window=ALERT_WINDOW, digest_period=ALERT_WINDOW)
+HEALTH = HealthState(max_lag=RETRY_TIME // 2)
+
+RETRY_POLICIES = RetryPolicies(
+    {
+        NoKeys: GiveUp(),
+        FailSend: Immediate().then(
+            Backoff(5, RETRY_TIME).then(
+                Backoff(60, RETRY_TIME, alert=True), after=3
+            ),
+            after=1
+        ),
+        DisableEndpoint: Backoff(30, RETRY_TIME).then(
+            AlertOnly(RETRY_TIME), after=3
+        ),
+    },
+    default=AlertOnly(RETRY_TIME)
+)
+
+
+@contextmanager
+def tenant_context(tenant):
+    """Опрос и уведомления от имени аккаунта `tenant`."""
+    token = CURRENT_TENANT.set(tenant)
+    try:
+        yield tenant
+    finally:
+        CURRENT_TENANT.reset(token)
+
+
+def current_account():
+    """Текущий аккаунт; вне контекста - чат из окружения."""
+    tenant = CURRENT_TENANT.get()
+    return TELEGRAM_CHAT_ID if tenant is None else tenant.account
+
+
+def current_chat_id():
+    """Чат текущего аккаунта; вне контекста - чат из окружения."""
+    tenant = CURRENT_TENANT.get()
+    return TELEGRAM_CHAT_ID if tenant is None else tenant.chat_id
+
+
+def current_headers():
+    """Заголовки запроса к API с токеном текущего аккаунта."""
+    tenant = CURRENT_TENANT.get()
+    if tenant is None:
+        return HEADERS
+    return {'Authorization': f'OAuth {tenant.practicum_token}'}
 
 
 def send_message(bot, message):
-    """Отправка сообщения ботом."""
-    global LAST_MESSAGE
+    """Отправка сообщения ботом в чат текущего аккаунта.
+
+    Для `SendExecutor` возвращает Future фоновой отправки.
+    """
+    return send_to_chat(bot, current_chat_id(), message)
+
+
+def send_to_chat(bot, chat_id, message):
+    """Отправка сообщения в чат `chat_id` без повтора последнего."""
     try:
-        if LAST_MESSAGE != message:
-            bot.send_message(TELEGRAM_CHAT_ID, message)
-            LAST_MESSAGE = message
+        if LAST_MESSAGES.get(chat_id, '') != message:
+            result = bot.send_message(chat_id, message)
+            if isinstance(result, Future):
+                result.add_done_callback(
+                    partial(message_sent, chat_id, message)
+                )
+                return result
+            LAST_MESSAGES[chat_id] = message
             logger.info('Сообщение успешно отправлено.')
     except Exception as error:
         raise FailSend from error
+    return None
+
+
+def message_sent(chat_id, message, future):
+    """Завершение фоновой отправки.
+
+    Сообщение запоминается как последнее только после доставки, чтобы
+    следующий опрос повторил неудавшуюся отправку.
+    """
+    error = future.exception()
+    if error is None:
+        LAST_MESSAGES[chat_id] = message
+        logger.info('Сообщение успешно отправлено.')
+        return
+    logger.error(f'{FailSend.__doc__} {error.__cause__}')
 
 
 def get_api_answer(current_timestamp):
@@ -69,16 +177,42 @@ def get_api_answer(current_timestamp):
     params = {'from_date': begining_period}
     try:
         homework_statuses = requests.get(
-            ENDPOINT, headers=HEADERS, params=params)
+            ENDPOINT, headers=current_headers(), params=params,
+            timeout=REQUEST_TIMEOUT)
     except Exception as error:
         raise DisableEndpoint from error
+    if homework_statuses.status_code in (
+        HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+    ):
+        raise BadToken
     if homework_statuses.status_code != HTTPStatus.OK:
         raise DisableEndpoint
     return homework_statuses.json()
 
 
+class HomeworkRecord(NamedTuple):
+    """Работа из ответа API: название и код статуса из STATUS_CODES.
+
+    Код None - статуса в ответе нет, UNKNOWN_STATUS - статус неизвестен.
+    """
+
+    homework_name: Optional[str]
+    status: Optional[int]
+
+
+def make_record(homework):
+    """Компактная запись из словаря работы в ответе API."""
+    if not isinstance(homework, dict):
+        raise ProblemEndpoint
+    status = homework.get('status')
+    return HomeworkRecord(
+        homework.get('homework_name'),
+        STATUS_CODES.get(status, UNKNOWN_STATUS) if status else None
+    )
+
+
 def check_response(response):
-    """Проверка ответа от API."""
+    """Проверка ответа от API; работы возвращаются записями HomeworkRecord."""
     if not isinstance(response, dict):
         raise TypeError('Ответ API не является словарем.')
     if 'homeworks' not in response:
@@ -86,32 +220,39 @@ def check_response(response):
     homeworks = response.get('homeworks')
     if not isinstance(homeworks, list):
         raise ProblemEndpoint
-    return homeworks
+    return [make_record(homework) for homework in homeworks]
 
 
 def parse_status(homework):
     """Обработка ответа и вывод статуса работы."""
-    global LAST_STATUS, LAST_MESSAGE
-    homework_name = homework.get('homework_name')
-    homework_status = homework.get('status')
-    if not all((homework_name, homework_status)):
+    if isinstance(homework, dict):
+        homework = make_record(homework)
+    homework_name, status_code = homework
+    if not homework_name or status_code is None:
         raise KeyError('В ответе нет нужной информации.')
-    if homework_status not in HOMEWORK_STATUSES:
+    if status_code == UNKNOWN_STATUS:
         raise KeyError('Неизвестный статус.')
+    homework_status = STATUS_NAMES[status_code]
     verdict = HOMEWORK_STATUSES[homework_status]
-    fix_status = LAST_STATUS.get(homework_name)
-    if homework_name in LAST_STATUS and fix_status == homework_status:
+    key = (current_account(), homework_name)
+    fix_status = LAST_STATUS.get(key)
+    if key in LAST_STATUS and fix_status == homework_status:
         logger.debug(
             f'В ответе отсутствуют новые статусы для работы {homework_name}.'
         )
-        return LAST_MESSAGE
+        return LAST_MESSAGES.get(current_chat_id(), '')
     else:
-        LAST_STATUS[homework_name] = verdict
+        LAST_STATUS[key] = verdict
         return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
 def check_tokens():
-    """Проверка наличия переменных окружения."""
+    """Проверка наличия переменных окружения.
+
+    С TENANTS_SOURCE токен Практикума и чат берутся из реестра аккаунтов.
+    """
+    if TENANTS_SOURCE:
+        return bool(TELEGRAM_TOKEN)
     keys = (TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, PRACTICUM_TOKEN)
     return all(keys)
 
@@ -126,8 +267,277 @@ def except_return(bot, error):
         logger.critical(message)
     else:
         logger.error(message)
-    send_message(bot, message)
-    time.sleep(RETRY_TIME)
+    if ALERTS.register(error, current_account()):
+        send_alert(bot, message)
+
+
+def send_alert(bot, message):
+    """Отправка уведомления об ошибке без прерывания опроса.
+
+    Повторы уведомлений ограничивает только ALERTS: LAST_MESSAGES
+    относится к сообщениям о статусах и здесь не проверяется и не
+    обновляется.
+    """
+    try:
+        result = bot.send_message(current_chat_id(), message)
+    except Exception as error:
+        logger.error(f'{FailSend.__doc__} {error}')
+        return
+    if isinstance(result, Future):
+        result.add_done_callback(alert_sent)
+
+
+def alert_sent(future):
+    """Завершение фоновой отправки уведомления об ошибке."""
+    error = future.exception()
+    if error is not None:
+        logger.error(f'{FailSend.__doc__} {error.__cause__}')
+
+
+def send_alert_digest(bot, registry):
+    """Отправка сводок подавленных ошибок, если подошел срок.
+
+    Сводка аккаунта уходит в его чат; сводки удаленных аккаунтов
+    отбрасываются.
+    """
+    for account, digest in ALERTS.digest():
+        tenant = registry.get(account)
+        if tenant is None:
+            continue
+        with tenant_context(tenant):
+            send_alert(bot, digest)
+
+
+def poll(bot, current_timestamp):
+    """Один опрос API с отправкой сообщений о новых статусах.
+
+    Возвращает работы из ответа и Future фоновых отправок. В режиме
+    сводок (DIGEST_WINDOW) сообщения копятся в DIGEST.
+    """
+    response = get_api_answer(current_timestamp)
+    homeworks = check_response(response)
+    futures = []
+    for homework in homeworks:
+        message = parse_status(homework)
+        if DIGEST is not None:
+            chat_id = current_chat_id()
+            if message != LAST_MESSAGES.get(chat_id, ''):
+                DIGEST.add(chat_id, message)
+            continue
+        future = send_message(bot, message)
+        if future is not None:
+            futures.append(future)
+    return homeworks, futures
+
+
+def poll_account(bot, scheduler, account, timestamps, pending):
+    """Опрос аккаунта; фоновые отправки попадают в `pending`."""
+    current_timestamp = int(time.time())
+    homeworks, futures = poll(bot, timestamps[account])
+    if futures:
+        pending[account] = (futures, current_timestamp)
+    else:
+        timestamps[account] = current_timestamp
+    HEALTH.success(account)
+    scheduler.done(
+        account, reviewing=review_state(homeworks), active=bool(homeworks)
+    )
+
+
+def finish_sends(pending, timestamps, attempts):
+    """Разбор завершенных фоновых отправок.
+
+    Начало периода опроса аккаунта сдвигается, а счетчик его неудачных
+    попыток сбрасывается, только когда доставлены все его сообщения.
+    Возвращает пары (аккаунт, ошибка) для сбоев.
+    """
+    failed = []
+    for account, (futures, timestamp) in list(pending.items()):
+        if not all(future.done() for future in futures):
+            continue
+        del pending[account]
+        errors = [
+            future.exception() for future in futures if future.exception()
+        ]
+        if errors:
+            failed.append((account, errors[0]))
+        else:
+            timestamps[account] = timestamp
+            attempts.pop(account, None)
+    return failed
+
+
+def send_digests(bot, force=False):
+    """Отправка сводок, окно которых закрылось.
+
+    При сбое неотправленные части сводки возвращаются в буфер и ждут
+    паузу повтора по политике FailSend.
+    """
+    if DIGEST is None:
+        return
+    for chat_id, messages in DIGEST.flush(force):
+        parts = render_digest(messages)
+        for index, (text, part) in enumerate(parts):
+            try:
+                future = send_to_chat(bot, chat_id, text)
+            except FailSend as error:
+                unsent = [message for _, rest in parts[index:]
+                          for message in rest]
+                digest_failed(chat_id, unsent, error.__cause__)
+                break
+            if future is None:
+                DIGEST_ATTEMPTS.pop(chat_id, None)
+            else:
+                future.add_done_callback(partial(digest_sent, chat_id, part))
+
+
+def digest_sent(chat_id, messages, future):
+    """Завершение фоновой отправки части сводки."""
+    error = future.exception()
+    if error is None:
+        DIGEST_ATTEMPTS.pop(chat_id, None)
+    else:
+        digest_failed(chat_id, messages, error.__cause__)
+
+
+def digest_failed(chat_id, messages, error):
+    """Возврат сообщений сводки в буфер с паузой до повтора."""
+    attempt = DIGEST_ATTEMPTS[chat_id] = DIGEST_ATTEMPTS.get(chat_id, 0) + 1
+    decision = RETRY_POLICIES.decide(FailSend(), attempt)
+    log = logger.critical if decision.alert else logger.error
+    log(
+        f'{FailSend.__doc__} {error} '
+        f'Повтор сводки через {decision.delay} с.'
+    )
+    DIGEST.restore(chat_id, messages, delay=decision.delay)
+
+
+def review_state(homeworks):
+    """Находится ли последняя работа на проверке; None - без изменений."""
+    if not homeworks:
+        return None
+    return homeworks[0].status == STATUS_CODES['reviewing']
+
+
+def poll_due(bot, registry, scheduler, timestamps, pending, attempts):
+    """Опрос очередной пачки наступивших аккаунтов.
+
+    За проход берется не больше POLL_BATCH аккаунтов, остальные ждут
+    в очереди планировщика, и более приоритетные опросы, наступившие
+    за это время, обгоняют их. Возвращает число опрошенных аккаунтов.
+    """
+    accounts = scheduler.pop_due(limit=POLL_BATCH)
+    failed = []
+    for account in accounts:
+        with tenant_context(registry.get(account)):
+            try:
+                poll_account(bot, scheduler, account, timestamps, pending)
+            except Exception as error:
+                failed.append((account, error))
+                continue
+            if account not in pending:
+                attempts.pop(account, None)
+    failed.extend(finish_sends(pending, timestamps, attempts))
+    for account, error in failed:
+        tenant = registry.get(account)
+        if tenant is None:
+            continue
+        with tenant_context(tenant):
+            handle_error(bot, scheduler, account, error, attempts)
+    return len(accounts)
+
+
+def handle_error(bot, scheduler, account, error, attempts):
+    """Применение политики повторов к ошибке опроса."""
+    HEALTH.failure(account)
+    attempts[account] = attempts.get(account, 0) + 1
+    decision = RETRY_POLICIES.decide(error, attempts[account])
+    if decision.alert:
+        except_return(bot, error)
+    if decision.delay is None:
+        logger.critical(f'Опрос {account} остановлен: {error!r}')
+        scheduler.remove(account)
+        return
+    if not decision.alert:
+        logger.warning(
+            f'Ошибка опроса {error!r}, повтор через {decision.delay} с.'
+        )
+    scheduler.retry(account, decision.delay)
+
+
+def load_tenants():
+    """Реестр аккаунтов из TENANTS_SOURCE или из переменных окружения."""
+    if TENANTS_SOURCE:
+        return TenantRegistry(open_source(TENANTS_SOURCE))
+    return TenantRegistry(EnvSource(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID))
+
+
+def sync_tenants(registry, scheduler, timestamps, pending, attempts,
+                 force=False):
+    """Перенос изменений реестра аккаунтов в планировщик.
+
+    Новые аккаунты распределяются по интервалу опроса, удаленные
+    снимаются вместе со всем состоянием опроса. Измененные аккаунты
+    опрашиваются в свой срок с новыми ключами, а остановленные из-за
+    ключей - возвращаются в опрос.
+    """
+    try:
+        diff = registry.reload(force)
+    except (BadTenants, OSError) as error:
+        logger.error(f'{BadTenants.__doc__} {error}')
+        return
+    now = time.time()
+    for index, tenant in enumerate(diff.added):
+        due = now + RETRY_TIME * index / len(diff.added)
+        scheduler.add(tenant.account, due=due)
+        timestamps[tenant.account] = int(now)
+    for tenant in diff.changed:
+        if tenant.account not in scheduler:
+            scheduler.add(tenant.account)
+    for tenant in diff.removed:
+        scheduler.remove(tenant.account)
+    forget_accounts(
+        {tenant.account for tenant in diff.removed},
+        timestamps, pending, attempts
+    )
+    if diff:
+        logger.info(
+            f'Аккаунты: добавлено {len(diff.added)}, '
+            f'изменено {len(diff.changed)}, удалено {len(diff.removed)}.'
+        )
+
+
+def forget_accounts(accounts, timestamps, pending, attempts):
+    """Удаление состояния опроса аккаунтов, снятых с учета."""
+    if not accounts:
+        return
+    for account in accounts:
+        timestamps.pop(account, None)
+        pending.pop(account, None)
+        attempts.pop(account, None)
+        HEALTH.forget(account)
+    for key in [key for key in LAST_STATUS if key[0] in accounts]:
+        del LAST_STATUS[key]
+
+
+def loop_wait(scheduler, next_sync):
+    """Пауза главного цикла; без аккаунтов - до перезагрузки реестра.
+
+    С TENANTS_SOURCE цикл не завершается, когда аккаунтов не осталось:
+    они могут вернуться при следующей перезагрузке реестра.
+    """
+    if scheduler:
+        return scheduler.wait_time()
+    return max(0, next_sync - time.monotonic())
+
+
+def make_bot():
+    """Бот Telegram; при заданном SEND_WORKERS - с фоновой отправкой."""
+    if not SEND_WORKERS:
+        return telegram.Bot(token=TELEGRAM_TOKEN)
+    executor = SendExecutor(TELEGRAM_TOKEN, workers=int(SEND_WORKERS))
+    HEALTH.probes['send_backlog'] = executor.backlog
+    return executor
 
 
 def main():
@@ -135,20 +545,31 @@ def main():
     if not check_tokens():
         logger.critical('Бот остановлен из-за отсутствия ключей.')
         return
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
+    bot = make_bot()
+    registry = load_tenants()
+    scheduler = PollScheduler(interval=RETRY_TIME)
+    timestamps = {}
+    pending = {}
+    attempts = {}
+    sync_tenants(
+        registry, scheduler, timestamps, pending, attempts, force=True
+    )
+    next_sync = time.monotonic() + TENANTS_RELOAD
+    if HEALTH_PORT:
+        serve_health(HEALTH, int(HEALTH_PORT))
 
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            for homework in homeworks:
-                message = parse_status(homework)
-                send_message(bot, message)
-            current_timestamp = int(time.time())
-            time.sleep(RETRY_TIME)
-        except Exception as error:
-            except_return(bot, error)
+    while scheduler or TENANTS_SOURCE:
+        if time.monotonic() >= next_sync:
+            sync_tenants(registry, scheduler, timestamps, pending, attempts)
+            next_sync = time.monotonic() + TENANTS_RELOAD
+        poll_due(bot, registry, scheduler, timestamps, pending, attempts)
+        send_alert_digest(bot, registry)
+        send_digests(bot)
+        wait = loop_wait(scheduler, next_sync)
+        HEALTH.tick(scheduler.lag(), wait)
+        time.sleep(wait)
+    send_digests(bot, force=True)
+    logger.critical('Бот остановлен: не осталось аккаунтов.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,115 @@
+from typing import NamedTuple, Optional
+
+
+class Decision(NamedTuple):
+    """Решение после ошибки: пауза до повтора (None - сдаться) и алерт."""
+
+    delay: Optional[float]
+    alert: bool
+
+
+class RetryPolicy:
+    """Политика повторов: решение по номеру неудачной попытки подряд."""
+
+    def __init__(self, alert=False):
+        self.alert = alert
+
+    def delay(self, attempt):
+        """Пауза перед повтором или None, если повторять не нужно."""
+        raise NotImplementedError
+
+    def decide(self, attempt):
+        """Решение для попытки номер `attempt`, начиная с 1."""
+        return Decision(self.delay(attempt), self.alert)
+
+    def then(self, other, after):
+        """Эта политика на первые `after` попыток, дальше - `other`."""
+        return Chain(self, other, after)
+
+
+class Immediate(RetryPolicy):
+    """Немедленный повтор."""
+
+    def delay(self, attempt):
+        """Без паузы."""
+        return 0
+
+
+class Backoff(RetryPolicy):
+    """Экспоненциально растущая пауза, не больше `maximum`."""
+
+    def __init__(self, base, maximum, factor=2, alert=False):
+        super().__init__(alert)
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+
+    def delay(self, attempt):
+        """Пауза base * factor ** (attempt - 1), не больше maximum."""
+        return min(self.maximum, self.base * self.factor ** (attempt - 1))
+
+
+class AlertOnly(RetryPolicy):
+    """Сообщить об ошибке и повторить в обычный срок."""
+
+    def __init__(self, interval):
+        super().__init__(alert=True)
+        self.interval = interval
+
+    def delay(self, attempt):
+        """Обычный интервал опроса."""
+        return self.interval
+
+
+class GiveUp(RetryPolicy):
+    """Сообщить об ошибке и прекратить опрос."""
+
+    def __init__(self):
+        super().__init__(alert=True)
+
+    def delay(self, attempt):
+        """Повторов нет."""
+        return None
+
+
+class Chain(RetryPolicy):
+    """Смена политики после `after` неудачных попыток."""
+
+    def __init__(self, first, second, after):
+        super().__init__()
+        self.first = first
+        self.second = second
+        self.after = after
+
+    def decide(self, attempt):
+        """Решение активной политики; вторая считает попытки с 1."""
+        if attempt <= self.after:
+            return self.first.decide(attempt)
+        return self.second.decide(attempt - self.after)
+
+    def delay(self, attempt):
+        """Пауза активной политики."""
+        return self.decide(attempt).delay
+
+
+class RetryPolicies:
+    """Сопоставление классов исключений и политик повторов.
+
+    Политика ищется по MRO исключения, так что политика для
+    `KittyBotExceptions` действует на всех наследников без своей.
+    """
+
+    def __init__(self, policies, default):
+        self.policies = dict(policies)
+        self.default = default
+
+    def for_error(self, error):
+        """Политика для исключения."""
+        for cls in type(error).__mro__:
+            if cls in self.policies:
+                return self.policies[cls]
+        return self.default
+
+    def decide(self, error, attempt):
+        """Решение для исключения на попытке номер `attempt`."""
+        return self.for_error(error).decide(attempt)
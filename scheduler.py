@@ -0,0 +1,275 @@
+import heapq
+import time
+from collections import deque
+
+REVIEWING, ACTIVE, IDLE = range(3)
+
+
+class HeapTimers:
+    """Таймеры на двоичной куче: вставка O(log n), отмена ленивая."""
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def add(self, key, deadline):
+        """Установка таймера; прежний таймер ключа отменяется."""
+        self._seq += 1
+        self._deadlines[key] = self._seq
+        heapq.heappush(self._heap, (deadline, self._seq, key))
+
+    def cancel(self, key):
+        """Отмена таймера ключа, если он есть."""
+        self._deadlines.pop(key, None)
+
+    def advance(self, now):
+        """Сработавшие к моменту `now` таймеры: список (срок, ключ)."""
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            deadline, seq, key = heapq.heappop(heap)
+            if self._deadlines.get(key) == seq:
+                del self._deadlines[key]
+                expired.append((deadline, key))
+        return expired
+
+    def next_deadline(self):
+        """Ближайший срок или None, если таймеров нет."""
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+
+class TimingWheel:
+    """Иерархическое колесо таймеров.
+
+    `levels` колес по `slots` ячеек; ячейка уровня l покрывает
+    slots ** l тиков длиной `resolution` секунд. Вставка и отмена - O(1),
+    при переходе через границу ячейки верхнего уровня ее таймеры
+    раскладываются по нижним уровням. Сроки дальше slots ** levels тиков
+    ждут в отдельном списке до оборота верхнего колеса.
+    """
+
+    def __init__(self, resolution=1.0, slots=64, levels=4, start=0.0):
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self._tick = int(start // resolution) - 1
+        self._wheels = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow = {}
+        self._where = {}
+
+    def __len__(self):
+        return len(self._where)
+
+    def add(self, key, deadline):
+        """Установка таймера; прежний таймер ключа отменяется."""
+        self.cancel(key)
+        tick = max(-int(-deadline // self.resolution), self._tick + 1)
+        self._place(key, deadline, tick)
+
+    def cancel(self, key):
+        """Отмена таймера ключа, если он есть."""
+        bucket = self._where.pop(key, None)
+        if bucket is not None:
+            del bucket[key]
+
+    def advance(self, now):
+        """Сработавшие к моменту `now` таймеры: список (срок, ключ)."""
+        target = int(now // self.resolution)
+        slots = self.slots
+        expired = []
+        while self._tick < target:
+            self._tick += 1
+            tick = self._tick
+            span = slots ** self.levels
+            if tick % span == 0:
+                overflow, self._overflow = self._overflow, {}
+                self._cascade(overflow)
+            for level in range(self.levels - 1, 0, -1):
+                span //= slots
+                if tick % span == 0:
+                    wheel = self._wheels[level]
+                    index = (tick // span) % slots
+                    bucket, wheel[index] = wheel[index], {}
+                    self._cascade(bucket)
+            wheel = self._wheels[0]
+            bucket, wheel[tick % slots] = wheel[tick % slots], {}
+            for key, (deadline, _) in bucket.items():
+                del self._where[key]
+                expired.append((deadline, key))
+        return expired
+
+    def next_deadline(self):
+        """Начало следующего тика: колесо проворачивается по тикам."""
+        if not self._where:
+            return None
+        return (self._tick + 1) * self.resolution
+
+    def _cascade(self, bucket):
+        for key, (deadline, tick) in bucket.items():
+            self._place(key, deadline, max(tick, self._tick))
+
+    def _place(self, key, deadline, tick):
+        slots = self.slots
+        span = 1
+        for level in range(self.levels):
+            if tick // (span * slots) == self._tick // (span * slots):
+                bucket = self._wheels[level][(tick // span) % slots]
+                break
+            span *= slots
+        else:
+            bucket = self._overflow
+        bucket[key] = (deadline, tick)
+        self._where[key] = bucket
+
+
+class _Account:
+    """Состояние аккаунта в планировщике."""
+
+    __slots__ = ('name', 'tier', 'reviewing', 'last_active', 'version')
+
+    def __init__(self, name, tier, last_active):
+        self.name = name
+        self.tier = tier
+        self.reviewing = False
+        self.last_active = last_active
+        self.version = 0
+
+
+class PollScheduler:
+    """Планировщик опросов аккаунтов с приоритетами.
+
+    Наступившие опросы выдаются в порядке приоритета: сначала аккаунты
+    с работой на ревью, затем недавно активные, затем остальные; внутри
+    класса раньше идет более высокий тариф `tier`. При перегрузке интервал
+    опроса простаивающих аккаунтов растягивается до `max_stretch` раз,
+    чтобы приоритетные аккаунты не отставали вместе со всеми.
+
+    Сроки опросов хранятся в `timers` (по умолчанию колесо таймеров
+    `TimingWheel`, подходит и `HeapTimers`).
+    """
+
+    def __init__(self, interval=600, active_period=86400, max_stretch=4,
+                 clock=time.time, timers=None):
+        self.interval = interval
+        self.active_period = active_period
+        self.max_stretch = max_stretch
+        self.clock = clock
+        self._accounts = {}
+        if timers is None:
+            timers = TimingWheel(start=clock())
+        self._timers = timers
+        self._ready = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __contains__(self, name):
+        return name in self._accounts
+
+    def add(self, name, tier=0, due=None, last_active=None):
+        """Добавление аккаунта; первый опрос в `due` или сразу."""
+        now = self.clock()
+        account = _Account(
+            name, tier, now if last_active is None else last_active
+        )
+        self._accounts[name] = account
+        self._push(account, now if due is None else due)
+
+    def remove(self, name):
+        """Удаление аккаунта; его запланированные опросы отбрасываются."""
+        self._accounts.pop(name, None)
+        self._timers.cancel(name)
+
+    def priority(self, account):
+        """Ключ приоритета аккаунта: меньше - важнее."""
+        if account.reviewing:
+            level = REVIEWING
+        elif self.clock() - account.last_active < self.active_period:
+            level = ACTIVE
+        else:
+            level = IDLE
+        return level, -account.tier
+
+    def pop_due(self, limit=None):
+        """Аккаунты, которые пора опросить, в порядке приоритета.
+
+        Не выданные из-за `limit` опросы остаются в очереди до следующего
+        вызова и обгоняются более приоритетными.
+        """
+        self._collect()
+        result = []
+        for priority in sorted(self._ready):
+            queue = self._ready[priority]
+            while queue and (limit is None or len(result) < limit):
+                _, version, name = queue.popleft()
+                account = self._accounts.get(name)
+                if account is not None and account.version == version:
+                    result.append(name)
+            if not queue:
+                del self._ready[priority]
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def done(self, name, reviewing=None, active=False):
+        """Учет результата опроса и планирование следующего."""
+        account = self._accounts.get(name)
+        if account is None:
+            return
+        now = self.clock()
+        if reviewing is not None:
+            account.reviewing = reviewing
+        if active:
+            account.last_active = now
+        interval = self.interval
+        if self.priority(account)[0] == IDLE:
+            interval *= self.stretch()
+        self._push(account, now + interval)
+
+    def retry(self, name, delay):
+        """Повтор опроса через `delay` секунд без смены состояния."""
+        account = self._accounts.get(name)
+        if account is not None:
+            self._push(account, self.clock() + delay)
+
+    def lag(self):
+        """На сколько секунд отстает самый старый наступивший опрос."""
+        self._collect()
+        oldest = [queue[0][0] for queue in self._ready.values() if queue]
+        if not oldest:
+            return 0
+        return max(0, self.clock() - min(oldest))
+
+    def stretch(self):
+        """Множитель интервала простаивающих аккаунтов при отставании."""
+        return min(self.max_stretch, 1 + self.lag() / self.interval)
+
+    def wait_time(self):
+        """Сколько секунд можно спать до следующего опроса."""
+        if self._ready or not self._accounts:
+            return 0
+        deadline = self._timers.next_deadline()
+        if deadline is None:
+            return self.interval
+        return max(0, deadline - self.clock())
+
+    def _collect(self):
+        for due, name in self._timers.advance(self.clock()):
+            account = self._accounts[name]
+            queue = self._ready.setdefault(self.priority(account), deque())
+            queue.append((due, account.version, name))
+
+    def _push(self, account, due):
+        self._seq += 1
+        account.version = self._seq
+        self._timers.add(account.name, due)
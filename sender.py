@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+from telegram.utils.request import Request
+
+from exceptions import FailSend
+
+
+class SendExecutor:
+    """Отправка сообщений Telegram в ограниченном пуле потоков.
+
+    Повторяет интерфейс `telegram.Bot.send_message`, но сразу возвращает
+    Future: медленные ответы Telegram не задерживают опрос API. Ошибки
+    отправки приходят через Future как `FailSend`. У пула свой пул
+    соединений по числу потоков.
+    """
+
+    def __init__(self, token, workers=4, base_url=None, timeout=5.0):
+        request = Request(
+            con_pool_size=workers, connect_timeout=timeout,
+            read_timeout=timeout
+        )
+        self.bot = telegram.Bot(token=token, base_url=base_url,
+                                request=request)
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='telegram-send'
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Постановка сообщения в очередь отправки; возвращает Future."""
+        with self._lock:
+            self._pending += 1
+        future = self._pool.submit(self._send, chat_id, text, kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def backlog(self):
+        """Число отправок в очереди и в работе."""
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=True):
+        """Остановка пула после отправки поставленных сообщений."""
+        self._pool.shutdown(wait=wait)
+
+    def _send(self, chat_id, text, kwargs):
+        try:
+            return self.bot.send_message(chat_id, text, **kwargs)
+        except Exception as error:
+            raise FailSend from error
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
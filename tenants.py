@@ -0,0 +1,207 @@
+import os
+import sqlite3
+from typing import NamedTuple
+
+from exceptions import BadTenants
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class Tenant(NamedTuple):
+    """Аккаунт: токен Практикума и чат для уведомлений."""
+
+    account: str
+    practicum_token: str
+    chat_id: str
+
+
+class TenantDiff(NamedTuple):
+    """Изменения реестра после перезагрузки источника."""
+
+    added: list
+    changed: list
+    removed: list
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+def make_tenant(row):
+    """Аккаунт из словаря или строки таблицы с проверкой полей."""
+    try:
+        if isinstance(row, dict):
+            values = [row[field] for field in Tenant._fields]
+        else:
+            values = list(row)
+        tenant = Tenant(*values)
+    except (KeyError, TypeError) as error:
+        raise BadTenants(f'Неполная запись аккаунта: {row!r}') from error
+    if any(value is None or value == '' for value in tenant):
+        raise BadTenants(f'Пустое поле в записи аккаунта: {row!r}')
+    return Tenant(*map(str, tenant))
+
+
+class EnvSource:
+    """Единственный аккаунт из переменных окружения."""
+
+    def __init__(self, practicum_token, chat_id):
+        self.tenant = Tenant(str(chat_id), practicum_token, str(chat_id))
+
+    def changed(self):
+        """Переменные окружения не меняются на лету."""
+        return False
+
+    def load(self):
+        """Список из одного аккаунта."""
+        return [self.tenant]
+
+
+class YamlSource:
+    """Аккаунты из YAML-файла со списком записей.
+
+    Каждая запись - словарь с ключами account, practicum_token, chat_id.
+    Изменение файла определяется по времени модификации и размеру.
+    """
+
+    def __init__(self, path):
+        if yaml is None:
+            raise BadTenants('Для YAML-источника нужен пакет PyYAML.')
+        self.path = path
+        self._stamp = None
+
+    def changed(self):
+        """Изменился ли файл с последней загрузки."""
+        return self._file_stamp() != self._stamp
+
+    def load(self):
+        """Список аккаунтов из файла.
+
+        Пустой или недописанный файл - ошибка, а не удаление всех
+        аккаунтов: он перечитывается на следующей проверке.
+        """
+        stamp = self._file_stamp()
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                rows = yaml.load(file, Loader=loader)
+        except yaml.YAMLError as error:
+            raise BadTenants(f'Ошибка разбора YAML: {error}') from error
+        if not rows:
+            raise BadTenants('YAML-файл аккаунтов пуст.')
+        if not isinstance(rows, list):
+            raise BadTenants('YAML-файл аккаунтов должен содержать список.')
+        tenants = [make_tenant(row) for row in rows]
+        self._stamp = stamp
+        return tenants
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+class SqliteSource:
+    """Аккаунты из таблицы SQLite (account, practicum_token, chat_id).
+
+    Изменения другими соединениями определяются по PRAGMA data_version
+    без чтения таблицы.
+    """
+
+    def __init__(self, path, table='tenants'):
+        self.table = table
+        self._connection = sqlite3.connect(path)
+        self._version = None
+
+    def changed(self):
+        """Менялась ли база с последней загрузки."""
+        return self._data_version() != self._version
+
+    def load(self):
+        """Список аккаунтов из таблицы."""
+        self._version = self._data_version()
+        try:
+            rows = self._connection.execute(
+                f'SELECT account, practicum_token, chat_id FROM {self.table}'
+            ).fetchall()
+        except sqlite3.Error as error:
+            raise BadTenants(f'Ошибка чтения аккаунтов: {error}') from error
+        return [make_tenant(row) for row in rows]
+
+    def _data_version(self):
+        return self._connection.execute('PRAGMA data_version').fetchone()[0]
+
+
+def open_source(path):
+    """Источник аккаунтов по расширению файла."""
+    if path.endswith(('.yaml', '.yml')):
+        return YamlSource(path)
+    if path.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SqliteSource(path)
+    raise BadTenants(f'Неизвестный тип источника аккаунтов: {path}')
+
+
+class TenantRegistry:
+    """Реестр аккаунтов с индексами по аккаунту и по чату.
+
+    `reload` перечитывает источник, только если он изменился, и
+    возвращает разницу, чтобы опрос затронул лишь измененные аккаунты.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._by_account = {}
+        self._by_chat = {}
+
+    def __len__(self):
+        return len(self._by_account)
+
+    def __iter__(self):
+        return iter(self._by_account.values())
+
+    def get(self, account):
+        """Аккаунт по имени или None."""
+        return self._by_account.get(account)
+
+    def for_chat(self, chat_id):
+        """Аккаунты, уведомления которых идут в чат."""
+        accounts = self._by_chat.get(str(chat_id), ())
+        return [self._by_account[account] for account in accounts]
+
+    def reload(self, force=False):
+        """Применение изменений источника; возвращает TenantDiff."""
+        if not force and not self.source.changed():
+            return TenantDiff([], [], [])
+        fresh = {tenant.account: tenant for tenant in self.source.load()}
+        current = self._by_account
+        diff = TenantDiff(
+            added=[
+                tenant for account, tenant in fresh.items()
+                if account not in current
+            ],
+            changed=[
+                tenant for account, tenant in fresh.items()
+                if account in current and current[account] != tenant
+            ],
+            removed=[
+                tenant for account, tenant in current.items()
+                if account not in fresh
+            ],
+        )
+        for tenant in diff.removed + diff.changed:
+            self._unindex(current[tenant.account])
+        for tenant in diff.added + diff.changed:
+            current[tenant.account] = tenant
+            self._by_chat.setdefault(tenant.chat_id, set()).add(
+                tenant.account
+            )
+        return diff
+
+    def _unindex(self, tenant):
+        self._by_account.pop(tenant.account, None)
+        accounts = self._by_chat.get(tenant.chat_id)
+        if accounts is not None:
+            accounts.discard(tenant.account)
+            if not accounts:
+                del self._by_chat[tenant.chat_id]
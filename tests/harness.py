@@ -0,0 +1,256 @@
+"""Фейковые серверы API Практикума и Telegram на localhost.
+
+Серверы отвечают по настоящему HTTP и умеют внедрять сбои: задержку с
+разбросом, серии ответов 5xx/429, медленную отдачу тела и сброс
+соединения. Сбои ставятся в очередь и расходуются по одному на запрос.
+
+    with FakePracticumServer() as practicum:
+        practicum.script([('hw1', 'reviewing')], [('hw1', 'approved')])
+        practicum.fail(HTTPStatus.BAD_GATEWAY, count=2)
+        requests.get(practicum.url, headers=..., params=...)
+"""
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PRACTICUM_PATH = '/api/user_api/homework_statuses/'
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    fake = None
+
+    def do_GET(self):
+        self.fake._dispatch(self)
+
+    def do_POST(self):
+        self.fake._dispatch(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer:
+    """Основа фейкового сервера: запуск, журнал запросов и сбои."""
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = []
+        self._random = random.Random(seed)
+        self._faults = deque()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def address(self):
+        """Адрес сервера вида http://127.0.0.1:порт."""
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def start(self):
+        """Запуск сервера в фоновом потоке на свободном порту."""
+        handler = type('Handler', (_Handler,), {'fake': self})
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        """Остановка сервера."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def fail(self, status, count=1, retry_after=None):
+        """Следующие `count` запросов получат ответ с кодом `status`."""
+        with self._lock:
+            self._faults.extend([('status', status, retry_after)] * count)
+
+    def slow_body(self, delay, count=1):
+        """Следующие ответы отдают вторую половину тела через `delay` с."""
+        with self._lock:
+            self._faults.extend([('slow', delay)] * count)
+
+    def reset(self, count=1):
+        """Следующие запросы обрываются сбросом соединения (RST)."""
+        with self._lock:
+            self._faults.extend([('reset',)] * count)
+
+    def handle(self, request):
+        """Ответ на запрос: пара (код, тело). Определяется наследником."""
+        raise NotImplementedError
+
+    def error_body(self, status, retry_after):
+        """Тело ответа с ошибкой."""
+        return {'code': status, 'message': HTTPStatus(status).phrase}
+
+    def _dispatch(self, handler):
+        length = int(handler.headers.get('Content-Length') or 0)
+        url = urlparse(handler.path)
+        body = handler.rfile.read(length) if length else b''
+        request = {
+            'method': handler.command,
+            'path': url.path,
+            'params': {k: v[-1] for k, v in parse_qs(url.query).items()},
+            'headers': dict(handler.headers),
+            'json': json.loads(body) if body else None,
+        }
+        with self._lock:
+            self.requests.append(request)
+            fault = self._faults.popleft() if self._faults else None
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if fault and fault[0] == 'reset':
+            self._reset(handler)
+            return
+        if fault and fault[0] == 'status':
+            _, status, retry_after = fault
+            body = self.error_body(status, retry_after)
+        else:
+            status, body = self.handle(request)
+        self._reply(handler, status, body, fault)
+
+    def _reply(self, handler, status, body, fault):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        if fault and fault[0] == 'status' and fault[2] is not None:
+            handler.send_header('Retry-After', str(fault[2]))
+        handler.end_headers()
+        if fault and fault[0] == 'slow':
+            half = len(data) // 2
+            handler.wfile.write(data[:half])
+            handler.wfile.flush()
+            time.sleep(fault[1])
+            data = data[half:]
+        try:
+            handler.wfile.write(data)
+        except OSError:
+            handler.close_connection = True
+
+    def _reset(self, handler):
+        handler.connection.setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0)
+        )
+        handler.connection.close()
+        handler.close_connection = True
+        handler.wfile = _Discard()
+
+
+class _Discard:
+    """Заглушка потока записи после сброса соединения."""
+
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class FakePracticumServer(FakeServer):
+    """API статусов домашних работ Практикума.
+
+    `script` задает последовательность ответов: каждый запрос с токеном
+    получает следующий шаг, после конца сценария - пустой список работ.
+    Сценарий без токена действует для токенов без своего сценария.
+    Запрос без заголовка OAuth или с токеном не из `tokens` получает 401.
+    """
+
+    def __init__(self, tokens=None, **kwargs):
+        super().__init__(**kwargs)
+        self.tokens = tokens
+        self._scripts = {}
+
+    @property
+    def url(self):
+        """Адрес для ENDPOINT."""
+        return self.address + PRACTICUM_PATH
+
+    def script(self, *steps, token=None):
+        """Сценарий ответов: шаг - список работ (имя, статус) или словарей."""
+        with self._lock:
+            self._scripts.setdefault(token, deque()).extend(
+                [self._homework(item) for item in step] for step in steps
+            )
+
+    def handle(self, request):
+        """Очередной шаг сценария для токена запроса."""
+        authorization = request['headers'].get('Authorization', '')
+        if not authorization.startswith('OAuth '):
+            return HTTPStatus.UNAUTHORIZED, self.error_body(401, None)
+        token = authorization[len('OAuth '):]
+        if self.tokens is not None and token not in self.tokens:
+            return HTTPStatus.UNAUTHORIZED, self.error_body(401, None)
+        if request['path'] != PRACTICUM_PATH:
+            return HTTPStatus.NOT_FOUND, self.error_body(404, None)
+        with self._lock:
+            script = self._scripts.get(
+                token if token in self._scripts else None
+            )
+            homeworks = script.popleft() if script else []
+        return HTTPStatus.OK, {
+            'homeworks': homeworks, 'current_date': int(time.time())
+        }
+
+    @staticmethod
+    def _homework(item):
+        if isinstance(item, dict):
+            return item
+        name, status = item
+        return {
+            'id': abs(hash(name)) % 100000, 'status': status,
+            'homework_name': name, 'reviewer_comment': '',
+            'date_updated': '2022-02-13T14:40:57Z', 'lesson_name': name,
+        }
+
+
+class FakeTelegramServer(FakeServer):
+    """Bot API Telegram: принимает sendMessage и копит сообщения."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.messages = []
+
+    @property
+    def base_url(self):
+        """Адрес для base_url у telegram.Bot и SendExecutor."""
+        return self.address + '/bot'
+
+    def handle(self, request):
+        """Ответ Bot API на sendMessage."""
+        if not request['path'].endswith('/sendMessage'):
+            return HTTPStatus.NOT_FOUND, self.error_body(404, None)
+        payload = request['json'] or {}
+        chat_id, text = payload.get('chat_id'), payload.get('text')
+        with self._lock:
+            self.messages.append((str(chat_id), text))
+            message_id = len(self.messages)
+        return HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id, 'date': int(time.time()),
+            'chat': {'id': int(chat_id), 'type': 'private'}, 'text': text,
+        }}
+
+    def error_body(self, status, retry_after):
+        """Ошибка в формате Bot API."""
+        body = {'ok': False, 'error_code': status,
+                'description': HTTPStatus(status).phrase}
+        if retry_after is not None:
+            body['parameters'] = {'retry_after': retry_after}
+        return body
@@ -0,0 +1,62 @@
+from alerts import AlertAggregator
+from exceptions import DisableEndpoint, FailSend
+from utils import FakeClock
+
+
+class TestAlertAggregator:
+
+    def test_duplicates_suppressed_within_window(self):
+        clock = FakeClock()
+        alerts = AlertAggregator(window=60, digest_period=600, clock=clock)
+        assert alerts.register(DisableEndpoint(), 1), (
+            'Первая ошибка должна отправляться сразу'
+        )
+        clock.now = 30
+        assert not alerts.register(DisableEndpoint(), 1), (
+            'Повтор ошибки внутри окна должен подавляться'
+        )
+        assert alerts.register(DisableEndpoint(), 2), (
+            'Ошибки разных аккаунтов не должны подавлять друг друга'
+        )
+        assert alerts.register(FailSend(), 1), (
+            'Ошибки разных классов не должны подавлять друг друга'
+        )
+        clock.now = 61
+        assert alerts.register(DisableEndpoint(), 1), (
+            'После окончания окна ошибка должна отправляться снова'
+        )
+
+    def test_digest_counts_suppressed(self):
+        clock = FakeClock()
+        alerts = AlertAggregator(window=600, digest_period=300, clock=clock)
+        for _ in range(4):
+            alerts.register(DisableEndpoint(), 1)
+        assert alerts.digest() == [], (
+            'Сводка не должна выдаваться раньше срока'
+        )
+        clock.now = 300
+        [(account, digest)] = alerts.digest()
+        assert account == 1
+        assert 'DisableEndpoint (1): 3' in digest, (
+            'Сводка должна содержать число подавленных повторов'
+        )
+        clock.now = 600
+        assert alerts.digest() == [], (
+            'Без новых повторов сводка не нужна'
+        )
+
+    def test_digest_split_by_account(self):
+        clock = FakeClock()
+        alerts = AlertAggregator(window=600, digest_period=300, clock=clock)
+        for account in ('alice', 'bob'):
+            alerts.register(DisableEndpoint(), account)
+            alerts.register(DisableEndpoint(), account)
+        alerts.register(FailSend(), 'bob')
+        alerts.register(FailSend(), 'bob')
+        clock.now = 300
+        digests = dict(alerts.digest())
+        assert 'bob' not in digests['alice'], (
+            'Сводка аккаунта не должна содержать чужие ошибки'
+        )
+        assert 'DisableEndpoint (bob): 1' in digests['bob']
+        assert 'FailSend (bob): 1' in digests['bob']
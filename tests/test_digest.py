@@ -0,0 +1,57 @@
+from digest import DigestBuffer, render_digest
+from utils import FakeClock
+
+
+class TestDigest:
+
+    def test_flush_by_window_and_size(self):
+        clock = FakeClock()
+        digest = DigestBuffer(window=60, max_items=3, clock=clock)
+        digest.add(1, 'a')
+        digest.add(1, 'a')
+        digest.add(2, 'x')
+        digest.add(2, 'y')
+        digest.add(2, 'z')
+        assert digest.flush() == [(2, ['x', 'y', 'z'])], (
+            'Сводка должна отправляться при достижении лимита сообщений'
+        )
+        clock.now = 60
+        assert digest.flush() == [(1, ['a'])], (
+            'Сводка должна отправляться по окончании окна без повторов'
+        )
+        assert len(digest) == 0
+
+    def test_restore_keeps_order(self):
+        digest = DigestBuffer()
+        digest.add(1, 'c')
+        digest.restore(1, ['a', 'b'])
+        assert digest.flush(force=True) == [(1, ['a', 'b', 'c'])]
+
+    def test_restored_chat_waits_for_delay(self):
+        clock = FakeClock()
+        digest = DigestBuffer(window=60, max_items=2, clock=clock)
+        digest.add(1, 'a')
+        digest.add(1, 'b')
+        [(_, messages)] = digest.flush()
+        digest.restore(1, messages, delay=30)
+        clock.now = 29
+        assert digest.flush() == [], (
+            'Возвращенная после сбоя сводка должна ждать паузу повтора'
+        )
+        clock.now = 30
+        assert digest.flush() == [(1, ['a', 'b'])]
+        digest.restore(1, ['a'], delay=30)
+        assert digest.flush(force=True) == [(1, ['a'])]
+
+    def test_render_fits_message_limit(self):
+        messages = [f'Изменился статус работы {n}. ' * 3 for n in range(200)]
+        parts = render_digest(messages, max_length=1000)
+        assert len(parts) > 1
+        assert all(len(text) <= 1000 for text, _ in parts), (
+            'Каждая часть сводки должна помещаться в сообщение Telegram'
+        )
+        assert [m for _, part in parts for m in part] == messages
+        assert parts[0][0].startswith(
+            f'Изменились статусы проверки работ ({len(parts[0][1])}):'
+        )
+        assert render_digest(['одно']) == [('одно', ['одно'])]
@@ -0,0 +1,413 @@
+import time
+from concurrent.futures import Future, wait
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+import telegram
+
+import homework
+from alerts import AlertAggregator
+from digest import DigestBuffer
+from exceptions import BadToken, DisableEndpoint, FailSend, NoKeys
+from harness import FakePracticumServer, FakeTelegramServer
+from health import HealthState
+from scheduler import PollScheduler
+from sender import SendExecutor
+from tenants import Tenant, TenantRegistry
+from utils import FakeClock
+
+TENANT = Tenant('student', 'practicum-token', '12345')
+
+
+@pytest.fixture
+def practicum(monkeypatch):
+    with FakePracticumServer(tokens={TENANT.practicum_token}) as server:
+        monkeypatch.setattr(homework, 'ENDPOINT', server.url)
+        with homework.tenant_context(TENANT):
+            yield server
+
+
+@pytest.fixture
+def fake_telegram():
+    with FakeTelegramServer() as server:
+        yield server
+
+
+class TestPracticumHarness:
+
+    def test_scripted_statuses(self, practicum):
+        practicum.script(
+            [('hw1', 'reviewing')], [('hw1', 'approved'), ('hw2', 'rejected')]
+        )
+        first = homework.check_response(homework.get_api_answer(1))
+        second = homework.check_response(homework.get_api_answer(2))
+        assert [r.homework_name for r in first] == ['hw1']
+        assert homework.review_state(first)
+        assert [r.homework_name for r in second] == ['hw1', 'hw2']
+        assert homework.check_response(homework.get_api_answer(3)) == []
+        request = practicum.requests[0]
+        assert request['params'] == {'from_date': '1'}
+        assert request['headers']['Authorization'] == 'OAuth practicum-token'
+
+    def test_error_burst_then_recovery(self, practicum):
+        practicum.fail(HTTPStatus.BAD_GATEWAY, count=2)
+        practicum.fail(HTTPStatus.TOO_MANY_REQUESTS, retry_after=1)
+        for _ in range(3):
+            with pytest.raises(DisableEndpoint):
+                homework.get_api_answer(1)
+        assert homework.get_api_answer(1)['homeworks'] == []
+
+    def test_default_script_only_for_tokens_without_own(self, practicum):
+        practicum.script([('shared', 'approved')], [('shared', 'approved')])
+        practicum.script([('own', 'reviewing')], token=TENANT.practicum_token)
+        first = homework.check_response(homework.get_api_answer(1))
+        assert [r.homework_name for r in first] == ['own']
+        assert homework.get_api_answer(1)['homeworks'] == [], (
+            'После конца своего сценария токен не должен получать общий'
+        )
+
+    def test_bad_token(self, practicum):
+        with homework.tenant_context(TENANT._replace(practicum_token='bad')):
+            with pytest.raises(BadToken) as error:
+                homework.get_api_answer(1)
+        assert isinstance(error.value, NoKeys)
+        decision = homework.RETRY_POLICIES.decide(error.value, 1)
+        assert decision.delay is None, (
+            'Отклоненный токен должен останавливать опрос как NoKeys'
+        )
+
+    def test_slow_body_times_out(self, practicum, monkeypatch):
+        monkeypatch.setattr(homework, 'REQUEST_TIMEOUT', 0.2)
+        practicum.slow_body(1)
+        with pytest.raises(DisableEndpoint):
+            homework.get_api_answer(1)
+
+    def test_connection_reset(self, practicum):
+        practicum.reset()
+        with pytest.raises(DisableEndpoint):
+            homework.get_api_answer(1)
+        assert homework.get_api_answer(1)['homeworks'] == []
+
+
+class TestTelegramHarness:
+
+    def test_rate_limit_is_fail_send(self, fake_telegram):
+        fake_telegram.fail(HTTPStatus.TOO_MANY_REQUESTS, retry_after=3)
+        bot = telegram.Bot('1234:abcdefg', base_url=fake_telegram.base_url)
+        with pytest.raises(FailSend) as error:
+            homework.send_to_chat(bot, 'rate-limited', 'text')
+        assert isinstance(error.value.__cause__, telegram.error.RetryAfter)
+        assert fake_telegram.messages == []
+
+
+class RecordingScheduler(PollScheduler):
+    """Планировщик, запоминающий паузы повторов."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = []
+
+    def retry(self, name, delay):
+        self.delays.append(delay)
+        super().retry(name, delay)
+
+
+class PollingLoop:
+    """Проходы главного цикла бота по фейковым серверам с ручными часами."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.now = 1000.0
+        self.scheduler = RecordingScheduler(
+            interval=homework.RETRY_TIME, clock=lambda: self.now
+        )
+        self.scheduler.add(TENANT.account)
+        self.tenants = {TENANT.account: TENANT}
+        self.timestamps = {TENANT.account: 1}
+        self.pending = {}
+        self.attempts = {}
+
+    def tick(self, seconds=0):
+        """Проход цикла через `seconds` секунд; число опрошенных.
+
+        После завершения фоновых отправок их итог разбирается еще одним
+        проходом без сдвига часов.
+        """
+        self.now += seconds
+        state = (self.timestamps, self.pending, self.attempts)
+        polled = homework.poll_due(
+            self.bot, self.tenants, self.scheduler, *state
+        )
+        for futures, _ in list(self.pending.values()):
+            wait(futures, timeout=10)
+        return polled + homework.poll_due(
+            self.bot, self.tenants, self.scheduler, *state
+        )
+
+
+class ListSource:
+    """Источник аккаунтов из списка, меняемого в тесте."""
+
+    def __init__(self, tenants):
+        self.tenants = tenants
+
+    def changed(self):
+        return True
+
+    def load(self):
+        return list(self.tenants)
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(homework, 'LAST_STATUS', {})
+    monkeypatch.setattr(homework, 'LAST_MESSAGES', {})
+    monkeypatch.setattr(homework, 'ALERTS', AlertAggregator())
+    monkeypatch.setattr(homework, 'HEALTH', HealthState())
+
+
+@pytest.fixture
+def executor(fake_telegram):
+    executor = SendExecutor(
+        '1234:abcdefg', workers=2, base_url=fake_telegram.base_url
+    )
+    yield executor
+    executor.shutdown()
+
+
+class TestPollingLoop:
+
+    def test_background_send_failures_back_off(
+        self, practicum, fake_telegram, executor, fresh_state
+    ):
+        practicum.script(
+            *[[('hw1', 'reviewing')]] * 10, token=TENANT.practicum_token
+        )
+        fake_telegram.fail(HTTPStatus.BAD_REQUEST, count=100)
+        loop = PollingLoop(executor)
+        assert loop.tick() == 1
+        for delay in (0, 5, 10, 20):
+            assert loop.tick(max(delay - 1, 0)) == 0
+            assert loop.tick(1) == 1
+        assert loop.attempts[TENANT.account] == 5, (
+            'Сбой фоновой отправки не должен сбрасывать счетчик попыток'
+        )
+        assert loop.scheduler.delays == [0, 5, 10, 20, 60]
+        assert loop.timestamps[TENANT.account] == 1
+        assert len(practicum.requests) == 5
+        assert fake_telegram.messages == []
+
+    def test_background_send_success_resets_attempts(
+        self, practicum, fake_telegram, executor, fresh_state
+    ):
+        practicum.script(
+            *[[('hw1', 'reviewing')]] * 3, token=TENANT.practicum_token
+        )
+        fake_telegram.fail(HTTPStatus.BAD_REQUEST, count=2)
+        loop = PollingLoop(executor)
+        loop.tick()
+        loop.tick(1)
+        assert loop.attempts[TENANT.account] == 2
+        loop.tick(5)
+        assert TENANT.account not in loop.attempts
+        assert loop.timestamps[TENANT.account] > 1
+        assert len(fake_telegram.messages) == 1
+
+    def test_registry_mode_survives_empty_scheduler(
+        self, practicum, fake_telegram, fresh_state, monkeypatch, tmp_path
+    ):
+        pytest.importorskip('yaml')
+        path = tmp_path / 'tenants.yaml'
+        row = '- {{account: student, practicum_token: {}, chat_id: 12345}}\n'
+        path.write_text(row.format('bad'), encoding='utf-8')
+        clock = FakeClock()
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+            if len(sleeps) == 1:
+                path.write_text(
+                    row.format(TENANT.practicum_token), encoding='utf-8'
+                )
+            if len(practicum.requests) > 1 or len(sleeps) > 100:
+                raise KeyboardInterrupt
+            time.sleep(min(seconds, 0.05))
+
+        monkeypatch.setattr(homework, 'time', SimpleNamespace(
+            time=lambda: 1000.0 + clock.now,
+            monotonic=clock, sleep=sleep
+        ))
+        monkeypatch.setattr(homework, 'TENANTS_SOURCE', str(path))
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+        monkeypatch.setattr(homework, 'make_bot', lambda: telegram.Bot(
+            '1234:abcdefg', base_url=fake_telegram.base_url
+        ))
+        with pytest.raises(KeyboardInterrupt):
+            homework.main()
+        assert sleeps[0] == homework.TENANTS_RELOAD, (
+            'Без аккаунтов бот должен ждать перезагрузки реестра, '
+            'а не завершаться'
+        )
+        tokens = [
+            request['headers']['Authorization']
+            for request in practicum.requests
+        ]
+        assert tokens == [
+            'OAuth bad', f'OAuth {TENANT.practicum_token}'
+        ], 'Аккаунт с исправленным токеном должен вернуться в опрос'
+
+    def test_due_account_overtakes_idle_batch(self, monkeypatch):
+        clock = FakeClock()
+        clock.now = 1000.0
+        scheduler = PollScheduler(
+            interval=600, active_period=60, clock=clock
+        )
+        for number in range(3 * homework.POLL_BATCH):
+            scheduler.add(f'idle{number}', last_active=0.0)
+        scheduler.add('student', due=1005.0)
+        polled = []
+
+        def poll_account(bot, scheduler, account, timestamps, pending):
+            polled.append(account)
+            clock.now += 1
+            scheduler.done(account)
+
+        monkeypatch.setattr(homework, 'poll_account', poll_account)
+        while homework.poll_due(None, {}, scheduler, {}, {}, {}):
+            pass
+        assert polled.index('student') == homework.POLL_BATCH, (
+            'Наступивший активный аккаунт должен обгонять остаток '
+            'очереди простаивающих'
+        )
+
+    def test_practicum_error_burst_backs_off(
+        self, practicum, fake_telegram, executor, fresh_state
+    ):
+        practicum.fail(HTTPStatus.BAD_GATEWAY, count=3)
+        loop = PollingLoop(executor)
+        assert loop.tick() == 1
+        for delay in (30, 60, 120):
+            assert loop.tick(delay - 1) == 0
+            assert loop.tick(1) == 1
+        assert loop.scheduler.delays == [30, 60, 120], (
+            'Серия 5xx должна повторяться с растущей паузой DisableEndpoint'
+        )
+        assert TENANT.account not in loop.attempts
+        assert loop.timestamps[TENANT.account] > 1
+        assert homework.HEALTH.report()['open_circuits'] == 0
+
+    def test_inline_send_failures_back_off(
+        self, practicum, fake_telegram, fresh_state
+    ):
+        practicum.script(
+            *[[('hw1', 'reviewing')]] * 3, token=TENANT.practicum_token
+        )
+        fake_telegram.fail(HTTPStatus.BAD_REQUEST, count=2)
+        bot = telegram.Bot('1234:abcdefg', base_url=fake_telegram.base_url)
+        loop = PollingLoop(bot)
+        loop.tick()
+        loop.tick(1)
+        assert loop.attempts[TENANT.account] == 2
+        assert loop.tick(4) == 0
+        assert loop.tick(1) == 1
+        assert loop.scheduler.delays == [0, 5]
+        assert TENANT.account not in loop.attempts
+        assert len(fake_telegram.messages) == 1
+
+    def test_alert_digest_goes_to_own_chat(self, fake_telegram, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(homework, 'ALERTS', AlertAggregator(
+            window=600, digest_period=300, clock=clock
+        ))
+        tenants = {
+            'alice': Tenant('alice', 'a', '111'),
+            'bob': Tenant('bob', 'b', '222'),
+        }
+        for account in ('alice', 'bob', 'gone'):
+            for _ in range(2):
+                homework.ALERTS.register(DisableEndpoint(), account)
+        clock.now = 300
+        bot = telegram.Bot('1234:abcdefg', base_url=fake_telegram.base_url)
+        homework.send_alert_digest(bot, tenants)
+        chats = {chat_id: text for chat_id, text in fake_telegram.messages}
+        assert sorted(chats) == ['111', '222'], (
+            'Сводки удаленных аккаунтов не должны никуда отправляться'
+        )
+        assert 'alice' in chats['111'] and 'bob' not in chats['111'], (
+            'Сводка аккаунта должна уходить только в его чат'
+        )
+
+    def test_repeated_alert_skips_status_dedup(
+        self, fake_telegram, fresh_state, monkeypatch
+    ):
+        clock = FakeClock()
+        monkeypatch.setattr(homework, 'ALERTS', AlertAggregator(
+            window=60, digest_period=3600, clock=clock
+        ))
+        bot = telegram.Bot('1234:abcdefg', base_url=fake_telegram.base_url)
+        homework.LAST_MESSAGES[TENANT.chat_id] = 'статус'
+        with homework.tenant_context(TENANT):
+            homework.except_return(bot, DisableEndpoint())
+            homework.except_return(bot, DisableEndpoint())
+            clock.now = 61
+            homework.except_return(bot, DisableEndpoint())
+        assert len(fake_telegram.messages) == 2, (
+            'Повтор уведомления после окна ALERTS должен отправляться'
+        )
+        assert homework.LAST_MESSAGES[TENANT.chat_id] == 'статус', (
+            'Уведомления не должны менять последнее сообщение о статусе'
+        )
+
+    def test_failed_digest_backs_off(
+        self, fake_telegram, fresh_state, monkeypatch
+    ):
+        clock = FakeClock()
+        digest = DigestBuffer(window=60, max_items=2, clock=clock)
+        monkeypatch.setattr(homework, 'DIGEST', digest)
+        monkeypatch.setattr(homework, 'DIGEST_ATTEMPTS', {})
+        fake_telegram.fail(HTTPStatus.BAD_REQUEST, count=100)
+        bot = telegram.Bot('1234:abcdefg', base_url=fake_telegram.base_url)
+        digest.add(TENANT.chat_id, 'a')
+        digest.add(TENANT.chat_id, 'b')
+        for second in range(6):
+            clock.now = second
+            homework.send_digests(bot)
+        assert len(fake_telegram.requests) == 2, (
+            'Неотправленная сводка должна ждать паузу, а не уходить '
+            'на каждом проходе цикла'
+        )
+        assert homework.DIGEST_ATTEMPTS[TENANT.chat_id] == 2
+        assert len(digest) == 2
+
+    def test_removed_account_state_is_cleared(
+        self, practicum, fake_telegram, executor, fresh_state
+    ):
+        practicum.fail(HTTPStatus.BAD_GATEWAY, count=3)
+        loop = PollingLoop(executor)
+        for delay in (0, 30, 60):
+            loop.tick(delay)
+        assert homework.HEALTH.report()['open_circuits'] == 1
+        source = ListSource([TENANT])
+        registry = TenantRegistry(source)
+        state = (loop.timestamps, loop.pending, loop.attempts)
+        homework.sync_tenants(registry, loop.scheduler, *state, force=True)
+        failed = Future()
+        failed.set_exception(FailSend())
+        loop.pending[TENANT.account] = ([failed], 5)
+        homework.LAST_STATUS[(TENANT.account, 'hw1')] = 'approved'
+        source.tenants = []
+        homework.sync_tenants(registry, loop.scheduler, *state)
+        assert TENANT.account not in loop.scheduler
+        assert state == ({}, {}, {}), (
+            'Удаленный аккаунт не должен оставлять состояние опроса'
+        )
+        assert homework.LAST_STATUS == {}
+        assert homework.HEALTH.report()['open_circuits'] == 0
+        loop.pending[TENANT.account] = ([failed], 5)
+        homework.poll_due(executor, registry, loop.scheduler, *state)
+        assert loop.attempts == {} and loop.timestamps == {}, (
+            'Сбой отправки удаленного аккаунта не должен обрабатываться'
+        )
+        assert fake_telegram.requests == []
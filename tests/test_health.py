@@ -0,0 +1,66 @@
+import json
+from http import HTTPStatus
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from health import HealthState, serve_health
+from utils import FakeClock
+
+
+def get(server, path):
+    url = f'http://127.0.0.1:{server.server_address[1]}{path}'
+    try:
+        with urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+class TestHealth:
+
+    def test_lag_grows_when_loop_stalls(self):
+        clock = FakeClock()
+        state = HealthState(max_lag=60, clock=clock)
+        state.tick(lag=5, wait=10)
+        clock.now = 10
+        assert state.lag() == 5
+        clock.now = 70
+        assert state.lag() == 65, (
+            'Зависший главный цикл должен увеличивать отставание'
+        )
+        assert not state.report()['healthy']
+
+    def test_circuit_opens_after_failures(self):
+        state = HealthState(failure_threshold=2)
+        state.success('other')
+        state.failure('chat')
+        assert state.report()['open_circuits'] == 0
+        state.failure('chat')
+        report = state.report()
+        assert report['open_circuits'] == 1
+        assert report['failing'] == {
+            'chat': {'failures': 2, 'last_success': None}
+        }, 'В отчете должны быть подробности только по сбойным аккаунтам'
+        state.success('chat')
+        assert state.report()['open_circuits'] == 0
+        assert state.report()['failing'] == {}
+
+    def test_endpoint_reports_unhealthy(self):
+        clock = FakeClock()
+        state = HealthState(max_lag=60, clock=clock)
+        state.probes['send_backlog'] = lambda: 7
+        server = serve_health(state, 0)
+        try:
+            state.tick(lag=0)
+            status, body = get(server, '/health')
+            assert status == HTTPStatus.OK
+            assert body['send_backlog'] == 7
+            state.tick(lag=120)
+            status, body = get(server, '/ready')
+            assert status == HTTPStatus.SERVICE_UNAVAILABLE, (
+                'При отставании больше порога проверка должна возвращать 503'
+            )
+            assert get(server, '/live')[0] == HTTPStatus.OK
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,34 @@
+import pytest
+
+import homework
+
+
+class TestHomeworkRecord:
+
+    def test_check_response_builds_records(self):
+        records = homework.check_response({'homeworks': [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+             'reviewer_comment': '', 'lesson_name': 'Итоговый проект'},
+            {'homework_name': 'hw2', 'status': 'unknown'},
+            {'homework_name': 'hw3'},
+        ]})
+        assert records == [
+            homework.HomeworkRecord('hw1', homework.STATUS_CODES['reviewing']),
+            homework.HomeworkRecord('hw2', homework.UNKNOWN_STATUS),
+            homework.HomeworkRecord('hw3', None),
+        ], (
+            'check_response должна сохранять только название и код статуса'
+        )
+        assert homework.review_state(records)
+
+    def test_check_response_rejects_non_dict_item(self):
+        with pytest.raises(homework.ProblemEndpoint):
+            homework.check_response({'homeworks': ['hw1']})
+
+    def test_parse_status_accepts_record(self):
+        record = homework.HomeworkRecord(
+            'record-hw', homework.STATUS_CODES['rejected']
+        )
+        assert homework.parse_status(record).endswith(
+            homework.HOMEWORK_STATUSES['rejected']
+        )
@@ -0,0 +1,40 @@
+from exceptions import DisableEndpoint, FailSend, KittyBotExceptions, NoKeys
+from retry import (
+    AlertOnly,
+    Backoff,
+    GiveUp,
+    Immediate,
+    RetryPolicies,
+)
+
+
+class TestRetryPolicies:
+
+    def test_backoff_capped(self):
+        policy = Backoff(5, 60)
+        assert [policy.delay(n) for n in range(1, 6)] == [5, 10, 20, 40, 60], (
+            'Пауза должна расти экспоненциально и не превышать максимум'
+        )
+        assert not policy.decide(1).alert
+
+    def test_chain_switches_policy(self):
+        policy = Immediate().then(Backoff(5, 60, alert=True), after=2)
+        decisions = [policy.decide(n) for n in range(1, 5)]
+        assert decisions == [(0, False), (0, False), (5, True), (10, True)], (
+            'После `after` попыток должна действовать вторая политика, '
+            'считающая попытки заново'
+        )
+
+    def test_policy_found_by_mro(self):
+        policies = RetryPolicies(
+            {NoKeys: GiveUp(), KittyBotExceptions: Backoff(1, 10)},
+            default=AlertOnly(600)
+        )
+        assert policies.decide(NoKeys(), 1) == (None, True), (
+            'Фатальная ошибка должна прекращать опрос'
+        )
+        assert policies.decide(FailSend(), 2) == (2, False), (
+            'Политика базового класса должна действовать на наследников'
+        )
+        assert policies.decide(DisableEndpoint(), 1).delay == 1
+        assert policies.decide(ValueError(), 1) == (600, True)
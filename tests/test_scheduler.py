@@ -0,0 +1,88 @@
+import random
+
+from scheduler import HeapTimers, PollScheduler, TimingWheel
+from utils import FakeClock
+
+
+class TestPollScheduler:
+
+    def test_due_polls_ordered_by_priority(self):
+        clock = FakeClock()
+        scheduler = PollScheduler(interval=10, active_period=100, clock=clock)
+        scheduler.add('idle', last_active=-100)
+        scheduler.add('active')
+        scheduler.add('paid', tier=1, last_active=-100)
+        scheduler.add('reviewing')
+        scheduler.pop_due()
+        scheduler.done('reviewing', reviewing=True)
+        for name in ('idle', 'active', 'paid'):
+            scheduler.done(name)
+        clock.now = 10
+        assert scheduler.pop_due(limit=3) == ['reviewing', 'active', 'paid'], (
+            'Наступившие опросы должны выдаваться по приоритету'
+        )
+        assert scheduler.pop_due() == ['idle'], (
+            'Не выданные из-за лимита опросы должны оставаться в очереди'
+        )
+
+    def test_idle_interval_stretched_under_lag(self):
+        clock = FakeClock()
+        scheduler = PollScheduler(interval=10, active_period=5, clock=clock)
+        for name in range(3):
+            scheduler.add(name, last_active=-100)
+        clock.now = 20
+        assert scheduler.lag() == 20
+        stretched = scheduler.pop_due(limit=1)[0]
+        scheduler.done(stretched)
+        for name in scheduler.pop_due():
+            scheduler.done(name)
+        clock.now = 30
+        assert stretched not in scheduler.pop_due(), (
+            'При отставании интервал простаивающих аккаунтов растягивается'
+        )
+        clock.now = 50
+        assert scheduler.pop_due() == [stretched]
+
+    def test_removed_account_not_polled(self):
+        clock = FakeClock()
+        scheduler = PollScheduler(interval=10, clock=clock)
+        scheduler.add('a')
+        scheduler.add('b')
+        scheduler.remove('a')
+        assert scheduler.pop_due() == ['b']
+        assert 'a' not in scheduler and len(scheduler) == 1
+
+
+class TestTimers:
+
+    def test_wheel_matches_heap(self):
+        rnd = random.Random(0)
+        wheel = TimingWheel(resolution=1, slots=4, levels=3)
+        heap = HeapTimers()
+        for key in range(2000):
+            deadline = rnd.randint(1, 200)
+            wheel.add(key, deadline)
+            heap.add(key, deadline)
+        for key in rnd.sample(range(2000), 300):
+            wheel.cancel(key)
+            heap.cancel(key)
+        assert len(wheel) == len(heap) == 1700
+        for now in range(0, 210, 7):
+            fired = sorted(wheel.advance(now))
+            assert fired == sorted(heap.advance(now)), (
+                'Колесо таймеров должно срабатывать в те же сроки, что и куча'
+            )
+            for deadline, key in fired:
+                assert deadline <= now
+        assert len(wheel) == 0
+
+    def test_wheel_readd_replaces_timer(self):
+        wheel = TimingWheel(resolution=1, slots=4, levels=2)
+        wheel.add('a', 5)
+        wheel.add('a', 40)
+        assert wheel.advance(10) == [], (
+            'Повторная установка таймера должна отменять прежний'
+        )
+        assert wheel.advance(40) == [(40, 'a')], (
+            'Таймер за пределами колес должен сработать в свой срок'
+        )
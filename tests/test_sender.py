@@ -0,0 +1,45 @@
+from concurrent.futures import Future
+from http import HTTPStatus
+
+import pytest
+import telegram
+
+from exceptions import FailSend
+from harness import FakeTelegramServer
+from sender import SendExecutor
+
+
+@pytest.fixture
+def fake_telegram():
+    with FakeTelegramServer() as server:
+        yield server
+
+
+class TestSendExecutor:
+
+    def test_send_returns_future(self, fake_telegram):
+        executor = SendExecutor(
+            '1234:abcdefg', workers=2, base_url=fake_telegram.base_url
+        )
+        futures = [executor.send_message(12345, str(n)) for n in range(5)]
+        assert all(isinstance(future, Future) for future in futures), (
+            'SendExecutor должен возвращать Future'
+        )
+        messages = [future.result(timeout=10) for future in futures]
+        executor.shutdown()
+        assert all(isinstance(m, telegram.Message) for m in messages)
+        assert [m.text for m in messages] == ['0', '1', '2', '3', '4']
+        assert sorted(fake_telegram.messages) == [
+            ('12345', str(n)) for n in range(5)
+        ]
+        assert executor.backlog() == 0
+
+    def test_send_error_is_fail_send(self, fake_telegram):
+        fake_telegram.fail(HTTPStatus.BAD_REQUEST)
+        executor = SendExecutor(
+            '1234:abcdefg', workers=1, base_url=fake_telegram.base_url
+        )
+        future = executor.send_message(12345, 'text')
+        with pytest.raises(FailSend):
+            future.result(timeout=10)
+        executor.shutdown()
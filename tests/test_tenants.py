@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+from exceptions import BadTenants
+from tenants import SqliteSource, Tenant, TenantRegistry, YamlSource, yaml
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'tenants.db')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE tenants '
+        '(account TEXT PRIMARY KEY, practicum_token TEXT, chat_id TEXT)'
+    )
+    connection.executemany('INSERT INTO tenants VALUES (?, ?, ?)', [
+        ('alice', 'token-a', '1'), ('bob', 'token-b', '1'),
+        ('carol', 'token-c', '3'),
+    ])
+    connection.commit()
+    yield path, connection
+    connection.close()
+
+
+class TestTenantRegistry:
+
+    def test_sqlite_incremental_reload(self, database):
+        path, connection = database
+        registry = TenantRegistry(SqliteSource(path))
+        diff = registry.reload()
+        assert len(diff.added) == 3 and len(registry) == 3
+        assert {t.account for t in registry.for_chat(1)} == {'alice', 'bob'}
+        assert not registry.reload(), (
+            'Без изменений в источнике реестр не должен меняться'
+        )
+        connection.execute(
+            "UPDATE tenants SET chat_id = '2' WHERE account = 'bob'"
+        )
+        connection.execute("DELETE FROM tenants WHERE account = 'carol'")
+        connection.execute("INSERT INTO tenants VALUES ('dave', 'd', '4')")
+        connection.commit()
+        diff = registry.reload()
+        assert diff.added == [Tenant('dave', 'd', '4')]
+        assert diff.changed == [Tenant('bob', 'token-b', '2')]
+        assert diff.removed == [Tenant('carol', 'token-c', '3')]
+        assert [t.account for t in registry.for_chat('1')] == ['alice'], (
+            'Индекс по чату должен обновляться при перезагрузке'
+        )
+        assert registry.for_chat('3') == []
+        assert registry.get('bob').chat_id == '2'
+
+    @pytest.mark.skipif(yaml is None, reason='PyYAML не установлен')
+    def test_yaml_source(self, tmp_path):
+        path = tmp_path / 'tenants.yaml'
+        path.write_text(
+            '- {account: alice, practicum_token: a, chat_id: 1}\n',
+            encoding='utf-8'
+        )
+        registry = TenantRegistry(YamlSource(str(path)))
+        assert registry.reload().added == [Tenant('alice', 'a', '1')]
+        path.write_text('- {account: alice, chat_id: 1}\n', encoding='utf-8')
+        with pytest.raises(BadTenants):
+            registry.reload()
+        assert registry.get('alice') is not None, (
+            'Ошибка в источнике не должна портить загруженный реестр'
+        )
+
+    @pytest.mark.skipif(yaml is None, reason='PyYAML не установлен')
+    @pytest.mark.parametrize('text', ['', '- {account: alice, chat_id: [1\n'])
+    def test_yaml_empty_or_broken_keeps_registry(self, tmp_path, text):
+        path = tmp_path / 'tenants.yaml'
+        path.write_text(
+            '- {account: alice, practicum_token: a, chat_id: 1}\n',
+            encoding='utf-8'
+        )
+        registry = TenantRegistry(YamlSource(str(path)))
+        registry.reload()
+        path.write_text(text, encoding='utf-8')
+        with pytest.raises(BadTenants):
+            registry.reload()
+        assert registry.get('alice') is not None, (
+            'Пустой или недописанный файл не должен удалять аккаунты'
+        )
+        assert registry.source.changed(), (
+            'Файл с ошибкой нужно перечитать на следующей проверке'
+        )
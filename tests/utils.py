@@ -37,3 +37,12 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class FakeClock:
+    """Часы для тестов: время задается атрибутом `now`."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now